@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+
+from analisis import agregaciones, colores, datos, esquema, memoria
+
+# Empezar a leer los libros en segundo plano mientras se dibuja el menú
+datos.precalentar()
 
 # Título de la aplicación
 st.title("Tasas de crecimiento matriculas e ingresos")
@@ -16,9 +18,6 @@ menu = [
 ]
 choice = st.sidebar.selectbox("Menú", menu)
 
-# Ruta del archivo Excel
-excel_file = "files/baseEnrollment.xlsx"
-
 
 def aplicar_escala_tres_colores(df, columnas_porcentuales, centro=50):
 
@@ -30,17 +29,11 @@ def aplicar_escala_tres_colores(df, columnas_porcentuales, centro=50):
             col_min = df[col].min()
             col_max = df[col].max()
 
-            norm = mcolors.TwoSlopeNorm(vmin=col_min, vcenter=centro, vmax=col_max)
-
             def color_celda(valor):
                 if pd.isnull(valor):
                     return ""  
-                # Obtenemos un RGBA a partir del colormap 'RdYlGn'
-                rgba = plt.cm.RdYlGn(norm(valor))
-                # Disminuimos la saturación para lograr un efecto pastel
-                pastel_rgba = tuple(0.2 + 0.75 * c for c in rgba[:3])  # Mezcla con blanco
-                # Convertimos a rgb(...) para CSS
-                return f"background-color: rgba({int(pastel_rgba [0]*255)}, {int(pastel_rgba [1]*255)}, {int(pastel_rgba [2]*255)}, 1); color: #202122"
+                # Estilo pastel precalculado del colormap 'RdYlGn'
+                return colores.estilo_rdylgn(valor, col_min, centro, col_max)
 
             # Aplicamos la función anterior a toda la columna col
             styled = styled.map(color_celda, subset=[col])
@@ -51,48 +44,163 @@ def aplicar_escala_tres_colores(df, columnas_porcentuales, centro=50):
 # =============================================================================
 # 1. Función para cargar tablas de los Semestres 10 y 20
 # =============================================================================
-def cargar_tabla_desde_rango(columnas, fila_inicio, num_filas, columnas_porcentuales):
+def cargar_tabla_desde_rango(periodo):
     try:
-        # Leer el rango específico de la hoja 'Hoja1'
-        df = pd.read_excel(
-            excel_file,
-            sheet_name="Hoja1",
-            usecols=columnas,
-            skiprows=fila_inicio - 1,  # Restar 1 porque pandas usa índice base 0
-            nrows=num_filas,
-            header=0,  # Asegura que se lean los encabezados correctamente
-        )
-        # Eliminar sufijos como .1, .2 en los encabezados
-        df.columns = df.columns.str.replace(r"\.\d+$", "", regex=True)
-
-        # Convertir las columnas porcentuales multiplicando por 100 si existen en los datos
-        for col in columnas_porcentuales:
-            if col in df.columns:
-                df[col] = df[col] * 100
-
-        return df
+        # Rango de la hoja 'Hoja1' ya limpio: encabezados sin sufijos .1, .2 y
+        # columnas porcentuales multiplicadas por 100 (ver analisis.esquema)
+        return datos.leer_crecimiento(periodo)
     except Exception as e:
+        columnas = datos.RANGOS_CRECIMIENTO[periodo]
         st.error(f"Error al cargar el rango '{columnas}' desde 'Hoja1': {e}")
         return pd.DataFrame()
 
 
 # Definir columnas porcentuales para cada semestre
-columnas_porcentuales_sem10 = ["202210", "202310", "202410", "202510"]
-columnas_porcentuales_sem20 = ["202220", "202320", "202420", "202520"]
+columnas_porcentuales_sem10 = esquema.SEMESTRES_CRECIMIENTO[10]
+columnas_porcentuales_sem20 = esquema.SEMESTRES_CRECIMIENTO[20]
+
+# Progreso y tiempos de lectura de cada hoja. Mientras se están leyendo hojas el
+# fragmento se refresca solo; al terminar se vuelve a dibujar la app completa
+# para dejar de consultar.
+carga_pendiente = datos.cargando()
+
+
+@st.fragment(run_every=0.5 if carga_pendiente else None)
+def mostrar_carga():
+    estado = datos.estado_carga()
+    terminadas = [fila for fila in estado if fila["estado"] in ("lista", "error")]
+    with st.expander("Carga de datos", expanded=carga_pendiente):
+        st.progress(
+            len(terminadas) / len(estado),
+            text=f"{len(terminadas)} de {len(estado)} hojas leídas",
+        )
+        st.dataframe(
+            pd.DataFrame(estado),
+            hide_index=True,
+            column_config={"segundos": st.column_config.NumberColumn(format="%.2f s")},
+        )
+    if carga_pendiente and not datos.cargando():
+        st.rerun()
+
+
+with st.sidebar:
+    mostrar_carga()
+
+# Problemas detectados al validar contra su esquema las tablas ya cargadas
+avisos_datos = datos.violaciones_cargadas()
+if avisos_datos:
+    with st.sidebar.expander(f"Calidad de datos ({len(avisos_datos)})"):
+        for aviso in avisos_datos:
+            st.warning(aviso)
+
+# =============================================================================
+# Vistas de participación
+# =============================================================================
+# Cada vista es un fragmento: recibe la hoja PREGRADO ya cargada y al cambiar
+# sus filtros solo se vuelve a ejecutar el fragmento, no la página completa.
+# Los gráficos se guardan por combinación de filtros y se comparten entre
+# sesiones, así que volver a una selección anterior no los reconstruye.
+@memoria.memorizar("participacion_enrollment", max_entradas=64)
+def figura_participacion(version, columna, titulo, semestres, facultades=None):
+    df_agrupado = agregaciones.participacion_enrollment(
+        datos.leer_pregrado(), columna, semestres=semestres, facultades=facultades
+    )
+    if df_agrupado.empty:
+        return None
+
+    # Plotly solo se importa cuando se elige una vista de gráficos
+    from analisis import graficos
+
+    # Gráfico de pastel: vino para la categoría con mayor participación
+    return graficos.figura_participacion(df_agrupado, columna, titulo)
+
+
+@st.fragment
+def vista_participacion_facultades(df_pregrado):
+    # Filtro de selección múltiple de semestres
+    semestres_disponibles = sorted(df_pregrado["SEMESTRE"].unique())
+    semestres_seleccionados = st.multiselect(
+        "Selecciona uno o más semestres:",
+        semestres_disponibles,
+        default=semestres_disponibles[0] if semestres_disponibles else None,
+    )
+
+    # Validar que haya selección
+    if not semestres_seleccionados:
+        st.warning(
+            "Por favor, selecciona al menos un semestre para visualizar los datos."
+        )
+        return
+
+    fig = figura_participacion(
+        datos.version_archivo(datos.RUTA_ENROLLMENT),
+        "FACULTAD",
+        "Participación por Facultad",
+        tuple(semestres_seleccionados),
+    )
+
+    # Verificamos que haya datos
+    if fig is None:
+        st.warning("No hay datos para los semestres seleccionados.")
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def vista_participacion_carreras(df_pregrado):
+    # Filtro de selección múltiple de facultades
+    facultades_disponibles = sorted(df_pregrado["FACULTAD"].unique())
+    facultades_seleccionadas = st.multiselect(
+        "Selecciona una o más facultades:",
+        facultades_disponibles,
+        default=facultades_disponibles[0] if facultades_disponibles else None,
+    )
+
+    # Validar selección de facultades
+    if not facultades_seleccionadas:
+        st.warning(
+            "Por favor, selecciona al menos una facultad para visualizar los datos."
+        )
+        return
+
+    # Filtro de selección múltiple de semestres
+    df_filtrado_facultad = df_pregrado[
+        df_pregrado["FACULTAD"].isin(facultades_seleccionadas)
+    ]
+    semestres_disponibles = sorted(df_filtrado_facultad["SEMESTRE"].unique())
+    semestres_seleccionados = st.multiselect(
+        "Selecciona uno o más semestres:",
+        semestres_disponibles,
+        default=semestres_disponibles[0] if semestres_disponibles else None,
+    )
+
+    # Validar selección de semestres
+    if not semestres_seleccionados:
+        st.warning(
+            "Por favor, selecciona al menos un semestre para visualizar los datos."
+        )
+        return
+
+    fig = figura_participacion(
+        datos.version_archivo(datos.RUTA_ENROLLMENT),
+        "CARRERA",
+        "Participación por Carrera",
+        tuple(semestres_seleccionados),
+        tuple(facultades_seleccionadas),
+    )
+
+    # Verificamos que haya datos
+    if fig is None:
+        st.warning("No hay datos para las facultades y semestres seleccionados.")
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+
 
 # =============================================================================
 # 2. Lógica según la elección del usuario
 # =============================================================================
 if choice == "Crecimiento de los periodos 10":
-    columnas_semestre_10 = "I:O"
-    fila_inicio_semestre_10 = 1
-    num_filas_semestre_10 = 74
-    semestre_10 = cargar_tabla_desde_rango(
-        columnas_semestre_10,
-        fila_inicio_semestre_10,
-        num_filas_semestre_10,
-        columnas_porcentuales_sem10,
-    )
+    semestre_10 = cargar_tabla_desde_rango(10)
 
     if not semestre_10.empty:
         # Aquí sustituimos el uso de background_gradient por nuestra nueva función
@@ -116,15 +224,7 @@ if choice == "Crecimiento de los periodos 10":
 
 
 elif choice == "Crecimiento de los periodos 20":
-    columnas_semestre_20 = "R:X"
-    fila_inicio_semestre_20 = 1
-    num_filas_semestre_20 = 74
-    semestre_20 = cargar_tabla_desde_rango(
-        columnas_semestre_20,
-        fila_inicio_semestre_20,
-        num_filas_semestre_20,
-        columnas_porcentuales_sem20,
-    )
+    semestre_20 = cargar_tabla_desde_rango(20)
 
     if not semestre_20.empty:
         styled_semestre_20 = aplicar_escala_tres_colores(
@@ -148,90 +248,12 @@ elif choice == "Crecimiento de los periodos 20":
 elif choice == "Participación Facultades":
     # --- Cargar datos de la hoja "PREGRADO" ---
     try:
-        df_pregrado = pd.read_excel(excel_file, sheet_name="PREGRADO", header=0)
+        df_pregrado = datos.leer_pregrado()
     except Exception as e:
         st.error(f"Error al leer la hoja 'PREGRADO': {e}")
         st.stop()
 
-    # Convertir ENROLLMENT a numérico
-    df_pregrado["ENROLLMENT"] = pd.to_numeric(
-        df_pregrado["ENROLLMENT"], errors="coerce"
-    )
-
-    # Filtro de selección múltiple de semestres
-    semestres_disponibles = sorted(df_pregrado["SEMESTRE"].unique())
-    semestres_seleccionados = st.multiselect(
-        "Selecciona uno o más semestres:",
-        semestres_disponibles,
-        default=semestres_disponibles[0] if semestres_disponibles else None,
-    )
-
-    # Validar que haya selección
-    if not semestres_seleccionados:
-        st.warning(
-            "Por favor, selecciona al menos un semestre para visualizar los datos."
-        )
-    else:
-        # Filtrar por los semestres seleccionados
-        df_filtrado = df_pregrado[df_pregrado["SEMESTRE"].isin(semestres_seleccionados)]
-
-        # Verificamos que haya datos
-        if df_filtrado.empty:
-            st.warning("No hay datos para los semestres seleccionados.")
-        else:
-            # Agrupar por FACULTAD
-            df_agrupado = df_filtrado.groupby("FACULTAD", as_index=False)[
-                "ENROLLMENT"
-            ].sum()
-
-            # Identificar la facultad con mayor participación
-            max_enrollment = df_agrupado["ENROLLMENT"].max()
-
-            # Definir función para mapear ENROLLMENT a escala de grises
-            def map_to_grayscale(value, min_val, max_val):
-                if max_val == min_val:
-                    gray_level = 169  # Valor por defecto si no hay variación
-                else:
-                    # Normalizar el valor entre 0 y 1
-                    norm = (value - min_val) / (max_val - min_val)
-                    # Invertir para que mayor participación sea más oscuro
-                    gray_level = (
-                        int(255 * (1 - norm) * 0.6) + 50
-                    )  # Ajusta según preferencia
-                return f"rgb({gray_level}, {gray_level}, {gray_level})"
-
-            # Obtener valores mínimos y máximos de ENROLLMENT (excluyendo el máximo)
-            min_enrollment = df_agrupado["ENROLLMENT"].min()
-            max_enrollment = df_agrupado["ENROLLMENT"].max()
-
-            # Asignar colores
-            colors = []
-            for enrollment in df_agrupado["ENROLLMENT"]:
-                if enrollment == max_enrollment:
-                    colors.append("#8d002e")
-                else:
-                    colors.append(
-                        map_to_grayscale(enrollment, min_enrollment, max_enrollment)
-                    )
-
-            # Crear un mapeo de colores para cada facultad
-            color_map = {
-                facultad: color
-                for facultad, color in zip(df_agrupado["FACULTAD"], colors)
-            }
-
-            # Crear el gráfico de pastel usando Plotly con colores personalizados
-            fig = px.pie(
-                df_agrupado,
-                values="ENROLLMENT",
-                names="FACULTAD",
-                hole=0.3,
-                color="FACULTAD",
-                color_discrete_map=color_map,
-                title="Participación por Facultad",
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+    vista_participacion_facultades(df_pregrado)
 
 # =============================================================================
 # 4. Nueva opción: Participación Carreras (gráfico de pastel)
@@ -239,114 +261,9 @@ elif choice == "Participación Facultades":
 elif choice == "Participación Carreras":
     # --- Cargar datos de la hoja "PREGRADO" ---
     try:
-        df_pregrado = pd.read_excel(excel_file, sheet_name="PREGRADO", header=0)
+        df_pregrado = datos.leer_pregrado()
     except Exception as e:
         st.error(f"Error al leer la hoja 'PREGRADO': {e}")
         st.stop()
 
-    # Convertir ENROLLMENT a numérico
-    df_pregrado["ENROLLMENT"] = pd.to_numeric(
-        df_pregrado["ENROLLMENT"], errors="coerce"
-    )
-
-    # Filtro de selección múltiple de facultades
-    facultades_disponibles = sorted(df_pregrado["FACULTAD"].unique())
-    facultades_seleccionadas = st.multiselect(
-        "Selecciona una o más facultades:",
-        facultades_disponibles,
-        default=facultades_disponibles[0] if facultades_disponibles else None,
-    )
-
-    # Validar selección de facultades
-    if not facultades_seleccionadas:
-        st.warning(
-            "Por favor, selecciona al menos una facultad para visualizar los datos."
-        )
-    else:
-        # Filtrar por facultades seleccionadas
-        df_filtrado_facultad = df_pregrado[
-            df_pregrado["FACULTAD"].isin(facultades_seleccionadas)
-        ]
-
-        # Filtro de selección múltiple de semestres
-        semestres_disponibles = sorted(df_filtrado_facultad["SEMESTRE"].unique())
-        semestres_seleccionados = st.multiselect(
-            "Selecciona uno o más semestres:",
-            semestres_disponibles,
-            default=semestres_disponibles[0] if semestres_disponibles else None,
-        )
-
-        # Validar selección de semestres
-        if not semestres_seleccionados:
-            st.warning(
-                "Por favor, selecciona al menos un semestre para visualizar los datos."
-            )
-        else:
-            # Filtrar por los semestres seleccionados
-            df_filtrado = df_filtrado_facultad[
-                df_filtrado_facultad["SEMESTRE"].isin(semestres_seleccionados)
-            ]
-
-            # Verificamos que haya datos
-            if df_filtrado.empty:
-                st.warning(
-                    "No hay datos para las facultades y semestres seleccionados."
-                )
-            else:
-                # Agrupar por CARRERA
-                df_agrupado = df_filtrado.groupby("CARRERA", as_index=False)[
-                    "ENROLLMENT"
-                ].sum()
-
-                # Identificar la carrera con mayor participación
-                max_enrollment_carrera = df_agrupado["ENROLLMENT"].max()
-
-                # Definir función para mapear ENROLLMENT a escala de grises
-                def map_to_grayscale(value, min_val, max_val):
-                    if max_val == min_val:
-                        gray_level = 169  # Valor por defecto si no hay variación
-                    else:
-                        # Normalizar el valor entre 0 y 1
-                        norm = (value - min_val) / (max_val - min_val)
-                        # Invertir para que mayor participación sea más oscuro
-                        gray_level = (
-                            int(255 * (1 - norm) * 0.6) + 50
-                        )  # Ajusta según preferencia
-                    return f"rgb({gray_level}, {gray_level}, {gray_level})"
-
-                # Obtener valores mínimos y máximos de ENROLLMENT (excluyendo el máximo)
-                min_enrollment_carrera = df_agrupado["ENROLLMENT"].min()
-                max_enrollment_carrera = df_agrupado["ENROLLMENT"].max()
-
-                # Asignar colores
-                colors = []
-                for enrollment in df_agrupado["ENROLLMENT"]:
-                    if enrollment == max_enrollment_carrera:
-                        colors.append("#8d002e")
-                    else:
-                        colors.append(
-                            map_to_grayscale(
-                                enrollment,
-                                min_enrollment_carrera,
-                                max_enrollment_carrera,
-                            )
-                        )
-
-                # Crear un mapeo de colores para cada carrera
-                color_map = {
-                    carrera: color
-                    for carrera, color in zip(df_agrupado["CARRERA"], colors)
-                }
-
-                # Crear el gráfico de pastel usando Plotly con colores personalizados
-                fig = px.pie(
-                    df_agrupado,
-                    values="ENROLLMENT",
-                    names="CARRERA",
-                    hole=0.3,
-                    color="CARRERA",
-                    color_discrete_map=color_map,
-                    title="Participación por Carrera",
-                )
-
-                st.plotly_chart(fig, use_container_width=True)
+    vista_participacion_carreras(df_pregrado)
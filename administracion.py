@@ -0,0 +1,259 @@
+# Contabilidad de memoria del servidor.
+#
+# Reúne lo que el proceso mantiene en memoria: las tablas y resultados en
+# caché de `analisis`, el estado de cada sesión de Streamlit, las cachés
+# propias de Streamlit y el RSS del proceso. Lo usan la página "Memoria" y el
+# endpoint JSON que levanta servidor.py con --admin-puerto:
+#
+#     GET  /memoria                                   informe completo
+#     POST /memoria/desalojar?cache=tablas[&clave=pregrado]
+#     POST /memoria/limite?cache=pronosticos&max_bytes=50000000[&max_entradas=8]
+#
+# Un límite que no se envía queda como está; con 0 se quita. La caché "tablas"
+# solo acepta max_bytes.
+#
+# Toda solicitud debe llevar la cabecera "Authorization: Bearer <token>". El
+# token se toma de la variable de entorno ADMIN_TOKEN o se genera al arrancar y
+# servidor.py lo muestra en la consola. La página "Memoria" pide el mismo token
+# antes de desalojar o cambiar límites:
+#
+#     curl -X POST -H "Authorization: Bearer $ADMIN_TOKEN" \
+#         "http://127.0.0.1:8601/memoria/desalojar?cache=tablas"
+#
+# Una página web abierta en el navegador del operador no puede enviar esa
+# cabecera a otro origen sin una consulta previa (CORS) que este endpoint no
+# acepta, así que no puede desalojar cachés ni cambiar límites por él.
+import contextlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from analisis import datos, memoria
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLAS = "tablas"
+
+# Token fijado por iniciar_endpoint; sin endpoint se usa ADMIN_TOKEN
+_token = None
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status") as status:
+            for linea in status:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+# Fuera del servidor (scripts, o AppTest, que usa un runtime simulado) no hay
+# runtime real ni sesiones que inspeccionar
+def _runtime():
+    from streamlit.runtime import Runtime
+
+    if Runtime.exists() and type(Runtime.instance()) is Runtime:
+        return Runtime.instance()
+    return None
+
+
+# Streamlit no tiene una API pública para listar las sesiones, así que este es
+# el único punto que usa sus internos (_session_mgr y el ScriptRunner de cada
+# sesión). Si cambian en otra versión se registra un aviso y el informe sale
+# sin sesiones en lugar de fallar. Devuelve (id, activa, ejecuciones, copia del
+# estado) por sesión.
+def _estados_de_sesiones():
+    runtime = _runtime()
+    if runtime is None:
+        return []
+    try:
+        return [
+            (
+                info.session.id,
+                # Las sesiones activas llegan como ActiveSessionInfo, que no
+                # tiene is_active(); las dos clases tienen `client`
+                info.client is not None,
+                info.script_run_count,
+                _copiar_estado(info.session),
+            )
+            for info in runtime._session_mgr.list_sessions()
+        ]
+    except AttributeError as error:
+        logger.warning("No se pudo leer las sesiones de Streamlit: %s", error)
+        return []
+
+
+# El estado de una sesión lo escribe el hilo que ejecuta su script, siempre
+# con el candado de su ScriptRunner; la copia se hace con ese mismo candado.
+# Entre ejecuciones no hay ScriptRunner ni nadie que escriba.
+def _copiar_estado(sesion):
+    estado = sesion.session_state
+    seguro = getattr(sesion._scriptrunner, "_session_state", None)
+    candado = getattr(seguro, "_lock", None) or contextlib.nullcontext()
+    with candado:
+        return {clave: estado[clave] for clave in estado}
+
+
+# Estado guardado por cada sesión: valores de widgets y claves de
+# st.session_state
+def sesiones():
+    return [
+        {
+            "sesion": sesion,
+            "activa": activa,
+            "ejecuciones": ejecuciones,
+            "claves": len(valores),
+            "bytes": memoria.tamano(valores),
+        }
+        for sesion, activa, ejecuciones, valores in _estados_de_sesiones()
+    ]
+
+
+# Tamaños que reporta Streamlit para sus propias cachés (st.cache_data,
+# st.cache_resource, archivos de medios, session_state)
+def caches_streamlit():
+    from streamlit.runtime.stats import CACHE_MEMORY_FAMILY
+
+    runtime = _runtime()
+    if runtime is None:
+        return []
+    estadisticas = runtime.stats_mgr.get_stats([CACHE_MEMORY_FAMILY])
+    return [
+        {
+            "tipo": stat.category_name,
+            "cache": stat.cache_name,
+            "bytes": stat.byte_length,
+        }
+        for stat in estadisticas.get(CACHE_MEMORY_FAMILY, [])
+    ]
+
+
+def limites():
+    return {CACHE_TABLAS: {"max_bytes": datos.limite_bytes()}, **memoria.limites()}
+
+
+def informe():
+    entradas = datos.inventario() + memoria.inventario()
+    lista_sesiones = sesiones()
+    return {
+        "proceso": {
+            "pid": os.getpid(),
+            "rss_bytes": rss_bytes(),
+            "bytes_en_caches": sum(e["bytes"] for e in entradas),
+            "bytes_en_sesiones": sum(s["bytes"] for s in lista_sesiones),
+        },
+        "limites": limites(),
+        # Último cambio detectado por tabla, sin las filas tocadas
+        "cambios": {
+            nombre: {k: v for k, v in cambio.items() if k != "tocadas"}
+            for nombre in datos.TABLAS
+            if (cambio := datos.cambios_recientes(nombre)) is not None
+        },
+        "entradas": entradas,
+        "sesiones": lista_sesiones,
+        "streamlit": caches_streamlit(),
+    }
+
+
+def desalojar(cache, clave=None):
+    if cache == CACHE_TABLAS:
+        return datos.desalojar(clave)
+    return memoria.desalojar(cache, clave)
+
+
+# Como memoria.fijar_limite: un límite omitido no cambia y None lo quita
+def fijar_limite(cache, max_bytes=memoria.SIN_CAMBIO, max_entradas=memoria.SIN_CAMBIO):
+    if cache == CACHE_TABLAS:
+        if max_entradas is not memoria.SIN_CAMBIO:
+            raise ValueError("La caché de tablas solo admite límite en bytes")
+        if max_bytes is not memoria.SIN_CAMBIO:
+            datos.fijar_limite(max_bytes)
+    else:
+        memoria.fijar_limite(cache, max_entradas=max_entradas, max_bytes=max_bytes)
+
+
+# =============================================================================
+# Autorización
+# =============================================================================
+def token():
+    return _token or os.environ.get("ADMIN_TOKEN")
+
+
+# Sin token configurado nada está autorizado
+def token_valido(recibido):
+    esperado = token()
+    if not esperado or not recibido:
+        return False
+    return hmac.compare_digest(recibido.encode(), esperado.encode())
+
+
+# =============================================================================
+# Endpoint JSON
+# =============================================================================
+class _Manejador(BaseHTTPRequestHandler):
+    def _autorizado(self):
+        tipo, _, recibido = self.headers.get("Authorization", "").partition(" ")
+        return tipo == "Bearer" and token_valido(recibido)
+
+    def _responder(self, estado, cuerpo):
+        contenido = json.dumps(cuerpo, ensure_ascii=False, default=str).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def do_GET(self):
+        if not self._autorizado():
+            return self._responder(401, {"error": "Token inválido o ausente"})
+        if urlparse(self.path).path != "/memoria":
+            return self._responder(404, {"error": "Ruta no encontrada"})
+        self._responder(200, informe())
+
+    def do_POST(self):
+        if not self._autorizado():
+            return self._responder(401, {"error": "Token inválido o ausente"})
+        url = urlparse(self.path)
+        parametros = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            cache = parametros["cache"]
+            if url.path == "/memoria/desalojar":
+                quitadas = desalojar(cache, parametros.get("clave"))
+                return self._responder(200, {"desalojadas": quitadas})
+            if url.path == "/memoria/limite":
+                numeros = {
+                    nombre: int(parametros[nombre]) or None
+                    for nombre in ("max_bytes", "max_entradas")
+                    if nombre in parametros
+                }
+                fijar_limite(cache, **numeros)
+                return self._responder(200, {"limites": limites()})
+        except KeyError as error:
+            return self._responder(400, {"error": f"Falta el parámetro {error}"})
+        except ValueError as error:
+            return self._responder(400, {"error": str(error)})
+        self._responder(404, {"error": "Ruta no encontrada"})
+
+    def log_message(self, formato, *args):
+        pass
+
+
+# Sirve el endpoint en un hilo del mismo proceso que el dashboard, para ver y
+# tocar las mismas cachés. Por defecto solo escucha en la máquina local. El
+# token queda en `servidor.token` y lo usa también la página "Memoria".
+def iniciar_endpoint(puerto, host="127.0.0.1", token=None):
+    global _token
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    _token = token or os.environ.get("ADMIN_TOKEN") or secrets.token_urlsafe(24)
+    servidor.token = _token
+    hilo = threading.Thread(
+        target=servidor.serve_forever, name="endpoint-memoria", daemon=True
+    )
+    hilo.start()
+    return servidor
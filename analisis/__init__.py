@@ -0,0 +1,2 @@
+# Lógica compartida por las páginas de Streamlit y las herramientas de línea de
+# comandos. Ningún módulo de este paquete importa Streamlit.
@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+
+# =============================================================================
+# Motor de ejecución
+# =============================================================================
+# Las agregaciones de participación y de matriculados corren con pandas o, si
+# la variable de entorno MOTOR_AGREGACIONES vale "polars", como planes
+# perezosos de Polars (analisis.motor_polars, requiere el paquete polars). Los
+# dos motores devuelven los mismos DataFrames; herramientas.comparar_motores
+# comprueba la paridad y mide los tiempos.
+MOTORES = ("pandas", "polars")
+
+
+def motor():
+    nombre = os.environ.get("MOTOR_AGREGACIONES", "pandas")
+    if nombre not in MOTORES:
+        raise ValueError(
+            f"MOTOR_AGREGACIONES debe ser uno de {', '.join(MOTORES)}, no '{nombre}'"
+        )
+    return nombre
+
+
+# Elige el motor para este proceso y para los que lance (la variable de entorno
+# se hereda). Con "polars" el motor se importa de inmediato, así la falta del
+# paquete se detecta al arrancar y no en la primera consulta.
+def fijar_motor(nombre):
+    if nombre not in MOTORES:
+        raise ValueError(f"El motor debe ser uno de {', '.join(MOTORES)}")
+    os.environ["MOTOR_AGREGACIONES"] = nombre
+    _polars()
+
+
+def _polars():
+    if motor() != "polars":
+        return None
+    from analisis import motor_polars
+
+    return motor_polars
+
+
+# Aplica filtros {columna: valores}; None o una lista vacía no filtran
+def filtrar(df, filtros):
+    for columna, valores in filtros.items():
+        if valores:
+            df = df[df[columna].isin(valores)]
+    return df
+
+
+# =============================================================================
+# Matriz BCG (hoja PREGRADO)
+# =============================================================================
+def filtrar_bcg(df, facultad, carreras=None, semestres=None):
+    df_filtrado = df[df["FACULTAD"] == facultad]
+    if carreras:
+        df_filtrado = df_filtrado[df_filtrado["CARRERA"].isin(carreras)]
+    if semestres:
+        df_filtrado = df_filtrado[df_filtrado["SEMESTRE"].isin(semestres)]
+    # Eliminar filas con datos nulos en las variaciones
+    return df_filtrado.dropna(subset=["Variación Enrollment", "Variación Ingresos"])
+
+
+# Estructura de la matriz BCG que se arma una vez por versión de la hoja. Por
+# facultad guarda las carreras y los pares carrera/semestre (opciones de los
+# filtros) y las filas con variaciones, partidas por semestre. Cada rebanada
+# trae sus arreglos listos para la traza y los extremos de sus ejes. "sizeref"
+# es la escala de tamaño común a todos los gráficos (mayor enrollment de la
+# hoja completa).
+def matriz_bcg(df):
+    df = df.assign(POSICION=np.arange(len(df)))
+    validas = df.dropna(subset=["Variación Enrollment", "Variación Ingresos"])
+
+    facultades = {}
+    for facultad, df_facultad in df.groupby("FACULTAD", sort=False):
+        facultades[facultad] = {
+            "carreras": df_facultad["CARRERA"].unique(),
+            "opciones": df_facultad[["CARRERA", "SEMESTRE"]].reset_index(drop=True),
+            "semestres": {},
+        }
+    for (facultad, semestre), df_semestre in validas.groupby(
+        ["FACULTAD", "SEMESTRE"], sort=False
+    ):
+        facultades[facultad]["semestres"][semestre] = _rebanada_bcg(
+            df_semestre["POSICION"].to_numpy(),
+            df_semestre["CARRERA"].to_numpy(),
+            df_semestre["Variación Enrollment"].to_numpy(),
+            df_semestre["Variación Ingresos"].to_numpy(),
+            df_semestre["ENROLLMENT"].to_numpy(),
+        )
+
+    return {
+        "facultades": facultades,
+        "sizeref": 2.0 * df["ENROLLMENT"].max() / (40.0**2),
+    }
+
+
+def _rebanada_bcg(posicion, carrera, x, y, enrollment):
+    return {
+        "posicion": posicion,
+        "carrera": carrera,
+        "x": x,
+        "y": y,
+        "enrollment": enrollment,
+        "limites": (x.min(), x.max(), y.min(), y.max()),
+    }
+
+
+# Rebanadas (semestre, rebanada) de la facultad que pasan los filtros, en el
+# orden en que aparecen los semestres en la hoja. Solo se recortan las
+# rebanadas con carreras fuera de la selección. Con `carreras` o `semestres`
+# vacíos no se filtra, como en filtrar_bcg.
+def seleccion_bcg(matriz, facultad, carreras=None, semestres=None):
+    rebanadas = []
+    for semestre, rebanada in matriz["facultades"][facultad]["semestres"].items():
+        if semestres and semestre not in semestres:
+            continue
+        if carreras:
+            mascara = np.isin(rebanada["carrera"], list(carreras))
+            if not mascara.any():
+                continue
+            if not mascara.all():
+                rebanada = _rebanada_bcg(
+                    *(
+                        rebanada[campo][mascara]
+                        for campo in ("posicion", "carrera", "x", "y", "enrollment")
+                    )
+                )
+        rebanadas.append((semestre, rebanada))
+    rebanadas.sort(key=lambda item: item[1]["posicion"][0])
+    return rebanadas
+
+
+# =============================================================================
+# Participación de facultades / carreras (hoja PREGRADO)
+# =============================================================================
+def participacion_enrollment(df, columna, semestres=None, facultades=None):
+    if motor_polars := _polars():
+        return motor_polars.participacion_enrollment(
+            df, columna, semestres=semestres, facultades=facultades
+        )
+    df_filtrado = df
+    if facultades is not None:
+        df_filtrado = df_filtrado[df_filtrado["FACULTAD"].isin(facultades)]
+    if semestres is not None:
+        df_filtrado = df_filtrado[df_filtrado["SEMESTRE"].isin(semestres)]
+    return df_filtrado.groupby(columna, as_index=False)["ENROLLMENT"].sum()
+
+
+# =============================================================================
+# Marketshare (baseMarketShare2.xlsx)
+# =============================================================================
+# `filtros` como en filtrar. Se pasan aparte, y no como tabla ya filtrada, para
+# que el motor Polars los incluya en su plan.
+def participacion_universidades(df, filtros=None):
+    if motor_polars := _polars():
+        return motor_polars.participacion_universidades(df, filtros)
+    filtered_df = filtrar(df, filtros or {})
+
+    # Agrupar por universidad y año
+    df_agrupado = (
+        filtered_df.groupby(["AÑO", "UNIVERSIDAD"])
+        .agg({"MATRICULADOS": "sum"})
+        .reset_index()
+    )
+    # Calcular la participación
+    df_agrupado["PARTICIPACION"] = df_agrupado.groupby("AÑO")["MATRICULADOS"].transform(
+        lambda x: x / x.sum()
+    )
+    return df_agrupado
+
+
+# =============================================================================
+# Matriculados e instituciones por carrera (baseMarketShare2.xlsx)
+# =============================================================================
+# Tablas AÑO x NIVEL con el número de instituciones y la suma de matriculados.
+# `filtros` como en participacion_universidades. Las filas sin FACULTAD no se
+# cuentan aunque no se filtre por facultad: la página 3 solo ofrece facultades
+# válidas y la API debe devolver los mismos totales.
+def instituciones_y_matriculados(df, filtros=None):
+    if motor_polars := _polars():
+        return motor_polars.instituciones_y_matriculados(df, filtros)
+    df_filt = filtrar(df[df["FACULTAD"].notna()], filtros or {})
+    instituciones = (
+        df_filt.groupby(["AÑO", "NIVEL"])["UNIVERSIDAD"]
+        .nunique()
+        .unstack(fill_value=0)
+        .sort_index()
+    )
+    matriculados = (
+        df_filt.groupby(["AÑO", "NIVEL"])["MATRICULADOS"]
+        .sum()
+        .unstack(fill_value=0)
+        .sort_index()
+    )
+    return instituciones, matriculados
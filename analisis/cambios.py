@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from analisis import agregaciones, esquema
+
+# =============================================================================
+# Diferencias entre dos versiones de una tabla
+# =============================================================================
+# Las filas se agrupan por su clave de dimensiones (ver "claves" en el
+# esquema). La clave se repite (p. ej. varias filas por carrera con distinta
+# facultad), así que se compara el grupo completo: su huella es la suma, módulo
+# 2**64, de las huellas de sus filas, que no depende del orden y cuenta las
+# filas repetidas. Un grupo que solo está en la versión nueva es "agregado",
+# uno que solo está en la anterior "eliminado" y uno cuya huella cambió
+# "modificado".
+
+
+def _huellas(df, claves):
+    valores = [c for c in df.columns if c not in claves]
+    return pd.DataFrame(
+        {
+            "clave": pd.util.hash_pandas_object(df[claves], index=False).to_numpy(),
+            "fila": pd.util.hash_pandas_object(df[valores], index=False).to_numpy(),
+        },
+        index=df.index,
+    )
+
+
+# Devuelve el resumen de cambios y las filas tocadas de ambas versiones, con la
+# columna "CAMBIO" (agregada, eliminada, antes, después).
+def comparar(anterior, nueva, claves):
+    huellas_anterior = _huellas(anterior, claves)
+    huellas_nueva = _huellas(nueva, claves)
+    grupos = pd.concat(
+        {
+            "anterior": huellas_anterior.groupby("clave")["fila"].agg(["sum", "size"]),
+            "nueva": huellas_nueva.groupby("clave")["fila"].agg(["sum", "size"]),
+        },
+        axis=1,
+    )
+    en_anterior = grupos[("anterior", "size")].notna()
+    en_nueva = grupos[("nueva", "size")].notna()
+    agregadas = grupos.index[en_nueva & ~en_anterior]
+    eliminadas = grupos.index[en_anterior & ~en_nueva]
+    ambas = grupos[en_anterior & en_nueva]
+    modificadas = ambas.index[
+        (ambas[("anterior", "sum")] != ambas[("nueva", "sum")])
+        | (ambas[("anterior", "size")] != ambas[("nueva", "size")])
+    ]
+
+    def filas(df, huellas, grupo, cambio):
+        return df[huellas["clave"].isin(grupo)].assign(CAMBIO=cambio)
+
+    tocadas = pd.concat(
+        [
+            filas(nueva, huellas_nueva, agregadas, "agregada"),
+            filas(anterior, huellas_anterior, eliminadas, "eliminada"),
+            filas(anterior, huellas_anterior, modificadas, "antes"),
+            filas(nueva, huellas_nueva, modificadas, "después"),
+        ],
+        ignore_index=True,
+    )
+    resumen = {
+        "claves_agregadas": len(agregadas),
+        "claves_eliminadas": len(eliminadas),
+        "claves_modificadas": len(modificadas),
+        "filas_anteriores": len(anterior),
+        "filas_nuevas": len(nueva),
+    }
+    return resumen, tocadas
+
+
+# Un agregado calculado con `filtros` ({columna: valores}) cambió si alguna fila
+# tocada, de cualquiera de las dos versiones, pasa esos filtros.
+def afecta(filtros, tocadas):
+    return not agregaciones.filtrar(tocadas, filtros).empty
+
+
+# =============================================================================
+# Comparación de dos libros desde la línea de comandos
+# =============================================================================
+# Uso:
+#     python -m analisis.cambios files/baseMarketShare.xlsx:FINAL \
+#         files/baseMarketShare2.xlsx:Hoja1 --detalle cambios.csv
+def _leer(argumento):
+    ruta, _, hoja = argumento.partition(":")
+    df = pd.read_excel(ruta, sheet_name=hoja or 0)
+    return esquema.aplicar_esquema(df, esquema.MARKETSHARE, ruta)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compara dos versiones de la base de marketshare por clave."
+    )
+    parser.add_argument("anterior", help="ruta.xlsx[:hoja]")
+    parser.add_argument("nueva", help="ruta.xlsx[:hoja]")
+    parser.add_argument("--detalle", help="CSV donde guardar las filas tocadas")
+    args = parser.parse_args(argv)
+
+    resumen, tocadas = comparar(
+        _leer(args.anterior), _leer(args.nueva), esquema.MARKETSHARE["claves"]
+    )
+    for nombre, valor in resumen.items():
+        print(f"{nombre:<20} {valor:>8}")
+    print(tocadas["CAMBIO"].value_counts().to_string())
+    if args.detalle:
+        tocadas.to_csv(args.detalle, index=False)
+    elif not tocadas.empty:
+        tocadas.head(20).to_csv(sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Colores de anclaje del colormap 'RdYlGn' (ColorBrewer, 11 clases), los mismos
+# que usa matplotlib. Tenerlos aquí evita importar matplotlib solo para
+# colorear las tablas de crecimiento.
+_RDYLGN = (
+    (0.6470588235294118, 0.0, 0.14901960784313725),
+    (0.8431372549019608, 0.18823529411764706, 0.15294117647058825),
+    (0.9568627450980393, 0.42745098039215684, 0.2627450980392157),
+    (0.9921568627450981, 0.6823529411764706, 0.3803921568627451),
+    (0.996078431372549, 0.8784313725490196, 0.5450980392156862),
+    (1.0, 1.0, 0.7490196078431373),
+    (0.8509803921568627, 0.9372549019607843, 0.5450980392156862),
+    (0.6509803921568628, 0.8509803921568627, 0.41568627450980394),
+    (0.4, 0.7411764705882353, 0.38823529411764707),
+    (0.10196078431372549, 0.596078431372549, 0.3137254901960784),
+    (0.0, 0.40784313725490196, 0.21568627450980393),
+)
+
+# Resolución de la tabla, igual a la de los colormaps de matplotlib
+NIVELES = 256
+
+
+# Tabla de estilos CSS en tonos pastel, calculada una sola vez al importar
+def _tabla_pastel():
+    anclas = np.array(_RDYLGN)
+    posiciones = np.linspace(0, 1, len(anclas))
+    muestras = np.linspace(0, 1, NIVELES)
+    rgb = np.column_stack(
+        [np.interp(muestras, posiciones, anclas[:, canal]) for canal in range(3)]
+    )
+    # Disminuimos la saturación para lograr un efecto pastel (mezcla con blanco)
+    pastel = 0.2 + 0.75 * rgb
+    return tuple(
+        f"background-color: rgba({int(r * 255)}, {int(g * 255)}, {int(b * 255)}, 1); "
+        "color: #202122"
+        for r, g, b in pastel
+    )
+
+
+ESTILOS_RDYLGN = _tabla_pastel()
+
+
+# Normalización con dos pendientes: vmin -> 0, vcentro -> 0.5, vmax -> 1
+def normalizar_dos_pendientes(valor, vmin, vcentro, vmax):
+    if not vmin < vcentro < vmax:
+        raise ValueError("vmin, vcentro y vmax deben estar en orden ascendente")
+    return float(np.interp(valor, [vmin, vcentro, vmax], [0.0, 0.5, 1.0]))
+
+
+def estilo_rdylgn(valor, vmin, vcentro, vmax):
+    norm = normalizar_dos_pendientes(valor, vmin, vcentro, vmax)
+    return ESTILOS_RDYLGN[min(int(norm * NIVELES), NIVELES - 1)]
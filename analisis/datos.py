@@ -0,0 +1,511 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+from openpyxl.utils import column_index_from_string
+
+from analisis import cambios, esquema, memoria
+
+logger = logging.getLogger(__name__)
+
+# Carpeta con los libros de Excel que alimentan el dashboard
+CARPETA_ARCHIVOS = Path(__file__).resolve().parent.parent / "files"
+
+RUTA_ENROLLMENT = CARPETA_ARCHIVOS / "baseEnrollment.xlsx"
+RUTA_MARKETSHARE = CARPETA_ARCHIVOS / "baseMarketShare2.xlsx"
+
+# Rangos de la hoja 'Hoja1' con las tablas de crecimiento de cada periodo
+RANGOS_CRECIMIENTO = {10: "I:O", 20: "R:X"}
+
+# Opciones de lectura de las hojas que no se leen completas. 'Hoja1' del libro
+# de enrollment se lee una sola vez, de la primera a la última columna de
+# crecimiento, y cada periodo toma su rango de ese DataFrame.
+HOJAS = {
+    (RUTA_ENROLLMENT, "Hoja1"): {"usecols": "I:X", "nrows": 74, "header": 0},
+}
+
+# Tablas que usan las páginas: archivo, hoja, rango de columnas dentro de lo
+# leído de la hoja (None: todas) y esquema. El orden es también el del
+# precalentamiento.
+TABLAS = {
+    "crecimiento_10": (
+        RUTA_ENROLLMENT,
+        "Hoja1",
+        RANGOS_CRECIMIENTO[10],
+        esquema.CRECIMIENTO_10,
+    ),
+    "pregrado": (RUTA_ENROLLMENT, "PREGRADO", None, esquema.PREGRADO),
+    "marketshare": (RUTA_MARKETSHARE, "Hoja1", None, esquema.MARKETSHARE),
+    "crecimiento_20": (
+        RUTA_ENROLLMENT,
+        "Hoja1",
+        RANGOS_CRECIMIENTO[20],
+        esquema.CRECIMIENTO_20,
+    ),
+}
+
+
+# Identificador de la versión de un archivo: cambia cada vez que el archivo se
+# reemplaza o se modifica, así que sirve como clave de caché.
+def version_archivo(ruta):
+    info = os.stat(ruta)
+    return f"{info.st_mtime_ns}-{info.st_size}"
+
+
+# =============================================================================
+# Caché de tablas compartida por todas las sesiones del proceso
+# =============================================================================
+# Cada tabla se lee y se valida contra su esquema una sola vez por versión del
+# archivo. Los DataFrames devueltos son compartidos: no deben modificarse.
+_cache = {}
+_bloqueo = threading.Lock()
+# Un bloqueo por libro que se está leyendo, con clave (ruta, versión)
+_bloqueos_carga = {}
+# Segundos que tardó la última lectura de cada tabla y errores pendientes
+_tiempos = {}
+_errores = {}
+# Contabilidad de memoria de cada entrada y límite opcional de la caché
+_metadatos = {}
+_limite_bytes = None
+# Último cambio detectado en las tablas que declaran "claves" en su esquema
+_cambios = {}
+
+
+# Lee las tablas `nombres` del libro `ruta` abriéndolo una sola vez; cada hoja
+# se parsea una vez aunque alimente varias tablas. Devuelve
+# ({nombre: (df, violaciones)}, segundos de todo el libro).
+def _leer_libro(ruta, nombres):
+    inicio = time.perf_counter()
+    hojas = {}
+    resultados = {}
+    with pd.ExcelFile(ruta) as libro:
+        for nombre in nombres:
+            _, hoja, columnas, esquema_tabla = TABLAS[nombre]
+            opciones = HOJAS.get((ruta, hoja), {})
+            if hoja not in hojas:
+                hojas[hoja] = libro.parse(hoja, **opciones)
+            df = _rango(hojas[hoja], opciones.get("usecols"), columnas)
+            resultados[nombre] = esquema.aplicar_esquema(df, esquema_tabla, nombre)
+    return resultados, time.perf_counter() - inicio
+
+
+# Columnas `columnas` ("I:O") de una hoja leída con usecols `leidas` ("I:X")
+def _rango(df, leidas, columnas):
+    if columnas is None:
+        return df
+    primera = column_index_from_string((leidas or "A").split(":")[0])
+    desde, hasta = (column_index_from_string(c) - primera for c in columnas.split(":"))
+    return df.iloc[:, desde : hasta + 1]
+
+
+# Tablas del libro `ruta` que faltan en caché para `version`. Se llama con
+# _bloqueo tomado.
+def _faltantes(ruta, version, nombres=None):
+    return [
+        nombre
+        for nombre in nombres or TABLAS
+        if TABLAS[nombre][0] == ruta and (nombre, version) not in _cache
+    ]
+
+
+def _guardar(clave, resultado, segundos):
+    nombre = clave[0]
+    for violacion in resultado[1]:
+        logger.warning(violacion)
+    ahora = time.time()
+    metadatos = {
+        "bytes": memoria.tamano(resultado),
+        "aciertos": 0,
+        "cargada": ahora,
+        "usada": ahora,
+    }
+    with _bloqueo:
+        previas = [(c, _cache[c]) for c in _cache if c[0] == nombre]
+    if previas and "claves" in TABLAS[nombre][3]:
+        clave_previa, (df_previo, _) = previas[-1]
+        _registrar_cambios(nombre, clave_previa[1], clave[1], df_previo, resultado[0])
+
+    with _bloqueo:
+        # Las versiones anteriores del mismo archivo ya no sirven
+        for anterior in [c for c in _cache if c[0] == nombre]:
+            _quitar(anterior)
+        _cache[clave] = resultado
+        _metadatos[clave] = metadatos
+        _tiempos[nombre] = segundos
+        _errores.pop(nombre, None)
+        _recortar(conservar=clave)
+
+
+# Compara la versión anterior de la tabla con la nueva y conserva en
+# memoria.memorizar los resultados que no dependen de las filas tocadas, así
+# una corrección pequeña del Excel no obliga a recalcular todo.
+def _registrar_cambios(nombre, version_anterior, version_nueva, anterior, nueva):
+    resumen, tocadas = cambios.comparar(anterior, nueva, TABLAS[nombre][3]["claves"])
+    conservadas, invalidadas = memoria.migrar(version_anterior, version_nueva, tocadas)
+    logger.info(
+        "%s cambió: %s claves agregadas, %s eliminadas, %s modificadas; "
+        "%s resultados conservados, %s invalidados",
+        nombre,
+        resumen["claves_agregadas"],
+        resumen["claves_eliminadas"],
+        resumen["claves_modificadas"],
+        conservadas,
+        invalidadas,
+    )
+    with _bloqueo:
+        _cambios[nombre] = {
+            "version_anterior": version_anterior,
+            "version_nueva": version_nueva,
+            "detectado": time.time(),
+            **resumen,
+            "resultados_conservados": conservadas,
+            "resultados_invalidados": invalidadas,
+            "tocadas": tocadas,
+        }
+
+
+def _quitar(clave):
+    del _cache[clave]
+    _metadatos.pop(clave, None)
+
+
+# Con un límite fijado se descartan las tablas usadas hace más tiempo; se
+# vuelven a leer cuando alguna página las pida. Se llama con _bloqueo tomado.
+def _recortar(conservar=None):
+    if _limite_bytes is None:
+        return
+    candidatas = sorted(
+        (c for c in _cache if c != conservar), key=lambda c: _metadatos[c]["usada"]
+    )
+    total = sum(m["bytes"] for m in _metadatos.values())
+    for clave in candidatas:
+        if total <= _limite_bytes:
+            break
+        total -= _metadatos[clave]["bytes"]
+        _quitar(clave)
+
+
+def _acierto(clave):
+    metadatos = _metadatos[clave]
+    metadatos["aciertos"] += 1
+    metadatos["usada"] = time.time()
+
+
+def _registrar_error(nombre, error):
+    logger.error("No se pudo leer la tabla %s: %s", nombre, error)
+    with _bloqueo:
+        _errores[nombre] = str(error)
+
+
+def _cargar(nombre):
+    ruta = TABLAS[nombre][0]
+    version = version_archivo(ruta)
+    clave = (nombre, version)
+
+    with _bloqueo:
+        if clave in _cache:
+            _acierto(clave)
+            return _cache[clave]
+        bloqueo_carga = _bloqueos_carga.setdefault((ruta, version), threading.Lock())
+
+    # Si otra sesión (o el precalentamiento) ya está leyendo el libro, se
+    # espera a que termine en lugar de leerlo dos veces. El bloqueo se quita
+    # después de guardar: antes, otro hilo no encontraría ni bloqueo ni tabla.
+    with bloqueo_carga:
+        try:
+            with _bloqueo:
+                if clave in _cache:
+                    return _cache[clave]
+                # Las demás tablas del libro salen de la misma lectura
+                nombres = _faltantes(ruta, version)
+            try:
+                resultados, segundos = _leer_libro(ruta, nombres)
+            except Exception as error:
+                for n in nombres:
+                    _registrar_error(n, error)
+                raise
+            for n, resultado in resultados.items():
+                _guardar((n, version), resultado, segundos)
+        finally:
+            with _bloqueo:
+                if _bloqueos_carga.get((ruta, version)) is bloqueo_carga:
+                    del _bloqueos_carga[(ruta, version)]
+    return resultados[nombre]
+
+
+# =============================================================================
+# Carga en paralelo
+# =============================================================================
+# Parsear un libro es trabajo de CPU (XML), así que los libros independientes
+# se leen en procesos separados y el tiempo total escala con los núcleos en
+# lugar de con el número de libros. Cada libro se abre una sola vez para todas
+# sus tablas (ver _leer_libro). Los resultados entran a la misma caché que usa
+# _cargar.
+#
+# Cada proceso hijo ("spawn") vuelve a importar pandas y openpyxl antes de leer
+# nada: medido, unos 0,9 s por proceso, mientras que parsear un libro cuesta
+# unos 2 ms por KB. Por eso solo se usan procesos con más de un núcleo
+# disponible y cuando los libros pendientes suman al menos
+# UMBRAL_BYTES_PARALELO. Por debajo los procesos no recuperan su arranque y se
+# lee en serie en el hilo actual. `procesos` es un máximo: nunca se usan más
+# procesos que núcleos.
+UMBRAL_BYTES_PARALELO = 2 * 1024**2
+
+
+def _nucleos():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity solo existe en Linux
+        return os.cpu_count() or 1
+
+
+def _procesos_para(rutas, procesos=None):
+    procesos = min(procesos or _nucleos(), _nucleos(), len(rutas))
+    tamano = sum(os.path.getsize(ruta) for ruta in rutas)
+    if procesos < 2 or tamano < UMBRAL_BYTES_PARALELO:
+        return 1
+    return procesos
+
+
+# `progreso(nombre, segundos, error)` se llama por cada tabla cuando termina su
+# libro.
+def cargar_en_paralelo(nombres=None, procesos=None, progreso=None):
+    propios = []
+    ajenas = []
+    for ruta in dict.fromkeys(TABLAS[nombre][0] for nombre in nombres or TABLAS):
+        version = version_archivo(ruta)
+        llave = (ruta, version)
+        with _bloqueo:
+            if not _faltantes(ruta, version, nombres):
+                continue
+            bloqueo_carga = _bloqueos_carga.setdefault(llave, threading.Lock())
+        # Los libros que ya está leyendo otro hilo solo se esperan
+        if not bloqueo_carga.acquire(blocking=False):
+            with _bloqueo:
+                ajenas += _faltantes(ruta, version, nombres)
+            continue
+        with _bloqueo:
+            faltantes = _faltantes(ruta, version, nombres)
+            if not faltantes:
+                _bloqueos_carga.pop(llave, None)
+        if faltantes:
+            propios.append((llave, faltantes, bloqueo_carga))
+        else:
+            bloqueo_carga.release()
+
+    pendientes = {llave: bloqueo_carga for llave, _, bloqueo_carga in propios}
+
+    # Cada libro se libera en cuanto sus tablas están guardadas, para que una
+    # página que lo espera no tenga que esperar también a los demás
+    def liberar(llave):
+        with _bloqueo:
+            _bloqueos_carga.pop(llave, None)
+            pendientes.pop(llave).release()
+
+    def terminar(llave, faltantes, leer):
+        try:
+            resultados, segundos = leer()
+        except Exception as error:
+            for nombre in faltantes:
+                _registrar_error(nombre, error)
+            liberar(llave)
+            if progreso is not None:
+                for nombre in faltantes:
+                    progreso(nombre, None, error)
+            return
+        for nombre, resultado in resultados.items():
+            _guardar((nombre, llave[1]), resultado, segundos)
+        liberar(llave)
+        if progreso is not None:
+            for nombre in faltantes:
+                progreso(nombre, segundos, None)
+
+    procesos = _procesos_para([ruta for (ruta, _), _, _ in propios], procesos)
+    try:
+        if procesos > 1:
+            # "spawn" porque el proceso del servidor tiene varios hilos vivos y
+            # hacer fork en ese estado no es seguro
+            with ProcessPoolExecutor(
+                max_workers=procesos, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                futuros = {
+                    pool.submit(_leer_libro, llave[0], faltantes): (llave, faltantes)
+                    for llave, faltantes, _ in propios
+                }
+                for futuro in as_completed(futuros):
+                    terminar(*futuros[futuro], futuro.result)
+        else:
+            for llave, faltantes, _ in propios:
+                terminar(llave, faltantes, lambda: _leer_libro(llave[0], faltantes))
+    finally:
+        for llave in list(pendientes):
+            liberar(llave)
+
+    for nombre in ajenas:
+        try:
+            _cargar(nombre)
+        except Exception as error:
+            if progreso is not None:
+                progreso(nombre, None, error)
+            continue
+        if progreso is not None:
+            progreso(nombre, _tiempos.get(nombre), None)
+
+
+# Estado de cada tabla para mostrarlo en la interfaz: "pendiente", "leyendo",
+# "lista" o "error", con el tiempo de la última lectura.
+def estado_carga():
+    filas = []
+    with _bloqueo:
+        for nombre, (ruta, hoja, _, _) in TABLAS.items():
+            version = version_archivo(ruta)
+            if (nombre, version) in _cache:
+                estado = "lista"
+            elif (ruta, version) in _bloqueos_carga:
+                estado = "leyendo"
+            elif nombre in _errores:
+                estado = "error"
+            else:
+                estado = "pendiente"
+            filas.append(
+                {
+                    "tabla": nombre,
+                    "archivo": ruta.name,
+                    "hoja": hoja,
+                    "estado": estado,
+                    "segundos": _tiempos.get(nombre) if estado == "lista" else None,
+                }
+            )
+    return filas
+
+
+def cargar_tabla(nombre):
+    return _cargar(nombre)[0]
+
+
+# Problemas encontrados al validar la tabla contra su esquema
+def violaciones(nombre):
+    return _cargar(nombre)[1]
+
+
+# =============================================================================
+# Contabilidad de memoria
+# =============================================================================
+def inventario():
+    ahora = time.time()
+    with _bloqueo:
+        return [
+            {
+                "cache": "tablas",
+                "clave": nombre,
+                "version": version,
+                "bytes": metadatos["bytes"],
+                "aciertos": metadatos["aciertos"],
+                "edad_s": ahora - metadatos["cargada"],
+                "inactiva_s": ahora - metadatos["usada"],
+            }
+            for (nombre, version), metadatos in _metadatos.items()
+        ]
+
+
+# Sin `nombre` se vacía toda la caché. Devuelve cuántas tablas se quitaron.
+def desalojar(nombre=None):
+    with _bloqueo:
+        claves = [c for c in _cache if nombre is None or c[0] == nombre]
+        for clave in claves:
+            _quitar(clave)
+    return len(claves)
+
+
+def limite_bytes():
+    return _limite_bytes
+
+
+# None quita el límite
+def fijar_limite(max_bytes):
+    global _limite_bytes
+    with _bloqueo:
+        _limite_bytes = max_bytes
+        _recortar()
+
+
+# Último cambio detectado en la tabla (resumen y filas tocadas) o None
+def cambios_recientes(nombre):
+    with _bloqueo:
+        return _cambios.get(nombre)
+
+
+# Vuelve a leer las tablas de `ruta` que están en caché con una versión
+# anterior del archivo. Sirve para que los cambios se detecten (y las cachés
+# derivadas se migren) antes de buscar un resultado por la versión nueva.
+def refrescar(ruta):
+    version = version_archivo(ruta)
+    with _bloqueo:
+        desactualizadas = {
+            nombre
+            for nombre, v in _cache
+            if TABLAS[nombre][0] == ruta and (nombre, version) not in _cache
+        }
+    for nombre in desactualizadas:
+        _cargar(nombre)
+
+
+# Violaciones de las tablas que ya están en memoria, sin forzar ninguna lectura
+def violaciones_cargadas():
+    with _bloqueo:
+        return [
+            v for _, violaciones_tabla in _cache.values() for v in violaciones_tabla
+        ]
+
+
+def leer_pregrado():
+    return cargar_tabla("pregrado")
+
+
+def leer_crecimiento(periodo):
+    return cargar_tabla(f"crecimiento_{periodo}")
+
+
+def leer_marketshare():
+    return cargar_tabla("marketshare")
+
+
+_precalentamiento = None
+
+
+# Lee en segundo plano (y en paralelo) todas las tablas para que el primer
+# visitante no pague el parseo de los libros. Solo arranca un hilo por proceso.
+# `esperar` permite retrasar la lectura hasta que el servidor termine de
+# arrancar.
+def precalentar(esperar=None):
+    global _precalentamiento
+    with _bloqueo:
+        if _precalentamiento is not None:
+            return _precalentamiento
+
+        def cargar_todo():
+            if esperar is not None:
+                esperar()
+            # Los errores quedan registrados y se muestran cuando una página
+            # pide la tabla
+            cargar_en_paralelo()
+
+        _precalentamiento = threading.Thread(
+            target=cargar_todo, name="precalentar-datos", daemon=True
+        )
+        _precalentamiento.start()
+    return _precalentamiento
+
+
+# Si hay tablas leyéndose ahora mismo (por el precalentamiento o una página)
+def cargando():
+    with _bloqueo:
+        return bool(_bloqueos_carga) or (
+            _precalentamiento is not None and _precalentamiento.is_alive()
+        )
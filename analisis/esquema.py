@@ -0,0 +1,116 @@
+import pandas as pd
+
+# =============================================================================
+# Esquemas declarativos de las hojas
+# =============================================================================
+# Cada columna declara:
+#   "tipo":      "texto" (se recortan espacios), "numero" o "entero"
+#   "escala":    factor por el que se multiplica (porcentajes guardados como 0-1)
+#   "vacios":    valores adicionales que significan "sin dato" (p. ej. 0)
+#   "requerida": si falta la columna se reporta como violación (por defecto sí)
+#   "completa":  si la columna no admite nulos
+# "quitar_sufijos" elimina los sufijos .1, .2 que pandas agrega a encabezados
+# repetidos. "claves" son las columnas de dimensión que identifican un grupo de
+# filas; con ellas se comparan dos versiones de la tabla (ver cambios.py).
+
+TEXTO = {"tipo": "texto"}
+PORCENTAJE = {"tipo": "numero", "escala": 100}
+
+PREGRADO = {
+    "columnas": {
+        "SEMESTRE": {"tipo": "texto", "completa": True},
+        "FACULTAD": {"tipo": "texto", "completa": True},
+        "CARRERA": {"tipo": "texto", "completa": True},
+        "ENROLLMENT": {"tipo": "numero"},
+        "INGRESOS": {"tipo": "numero"},
+        "Variación Enrollment": PORCENTAJE,
+        "Variación Ingresos": PORCENTAJE,
+    },
+}
+
+MARKETSHARE = {
+    "columnas": {
+        "NIVEL": {"tipo": "texto", "completa": True},
+        "AÑO": {"tipo": "entero", "completa": True},
+        "REGION": TEXTO,
+        "UNIVERSIDAD": {"tipo": "texto", "completa": True},
+        "FINANCIAMIENTO": TEXTO,
+        "CARRERA": TEXTO,
+        # La hoja marca con 0 las carreras sin facultad asignada
+        "FACULTAD": {"tipo": "texto", "vacios": (0, "0")},
+        "MATRICULADOS": {"tipo": "numero"},
+    },
+    "claves": ["AÑO", "UNIVERSIDAD", "CARRERA", "NIVEL", "REGION", "FINANCIAMIENTO"],
+}
+
+
+def crecimiento(semestres):
+    columnas = {"Facultad": TEXTO, "Carrera": TEXTO, "Variable": TEXTO}
+    columnas.update({semestre: PORCENTAJE for semestre in semestres})
+    return {"quitar_sufijos": True, "columnas": columnas}
+
+
+# Columnas porcentuales de las tablas de crecimiento de cada periodo
+SEMESTRES_CRECIMIENTO = {
+    10: ["202210", "202310", "202410", "202510"],
+    20: ["202220", "202320", "202420", "202520"],
+}
+CRECIMIENTO_10 = crecimiento(SEMESTRES_CRECIMIENTO[10])
+CRECIMIENTO_20 = crecimiento(SEMESTRES_CRECIMIENTO[20])
+
+
+# =============================================================================
+# Aplicación del esquema
+# =============================================================================
+def _texto(serie, vacios):
+    faltantes = serie.isna() | serie.isin(vacios)
+    # Los números enteros leídos como float (por un nulo) no deben quedar "2021.0"
+    if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+        serie = serie.astype("Int64")
+    valores = serie.astype(str).str.strip()
+    faltantes |= valores == ""
+    return valores.where(~faltantes)
+
+
+def _numero(serie):
+    return pd.to_numeric(serie, errors="coerce")
+
+
+# Devuelve (df, violaciones). El DataFrame resultante queda listo para el
+# análisis: las páginas no deben volver a convertir tipos.
+def aplicar_esquema(df, esquema, nombre=""):
+    violaciones = []
+    df = df.copy()
+    if esquema.get("quitar_sufijos"):
+        df.columns = df.columns.str.replace(r"\.\d+$", "", regex=True)
+
+    for columna, regla in esquema["columnas"].items():
+        if columna not in df.columns:
+            if regla.get("requerida", True):
+                violaciones.append(f"{nombre}: falta la columna '{columna}'")
+            continue
+
+        original = df[columna]
+        vacios = list(regla.get("vacios", ()))
+        if regla["tipo"] == "texto":
+            serie = _texto(original, vacios)
+        else:
+            enmascarado = original.mask(original.isin(vacios))
+            serie = _numero(enmascarado)
+            invalidos = int((serie.isna() & enmascarado.notna()).sum())
+            if invalidos:
+                violaciones.append(
+                    f"{nombre}: {invalidos} valores no numéricos en '{columna}'"
+                )
+            if "escala" in regla:
+                serie = serie * regla["escala"]
+            if regla["tipo"] == "entero" and serie.notna().all():
+                serie = serie.astype("int64")
+
+        if regla.get("completa") and serie.isna().any():
+            violaciones.append(
+                f"{nombre}: {int(serie.isna().sum())} filas sin '{columna}'"
+            )
+        df[columna] = serie
+
+    return df, violaciones
@@ -0,0 +1,253 @@
+# Definir la función para generar colores en escala de grises
+def generar_grises(num_colores, inicio=211, fin=0):
+
+    if num_colores == 1:
+        gris = int((inicio + fin) / 2)
+        return [f"#{gris:02X}{gris:02X}{gris:02X}"]
+
+    paso = (inicio - fin) / (num_colores - 1)
+    colores = []
+    for i in range(num_colores):
+        gris = int(inicio - paso * i)
+        gris = max(0, min(255, gris))
+        colores.append(f"#{gris:02X}{gris:02X}{gris:02X}")
+    return colores
+
+
+# Calcular los límites de los ejes con padding proporcional
+def calcular_paddings(min_val, max_val):
+    rango = max_val - min_val
+    if rango == 0:
+        rango = abs(max_val) if max_val != 0 else 1  # Evitar división por cero
+    padding = rango * 0.1  # 10% del rango
+    return min_val - padding, max_val + padding
+
+
+# =============================================================================
+# Matriz BCG
+# =============================================================================
+# Recibe las rebanadas de agregaciones.seleccion_bcg y la escala de tamaño de
+# agregaciones.matriz_bcg
+def figura_bcg(rebanadas, sizeref):
+    # Plotly se importa solo al construir una figura (ver figura_participacion)
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Semestres en el orden en que aparecen en la hoja
+    semestres_unicos = [semestre for semestre, _ in rebanadas]
+
+    # Definir el color vino para el semestre "202510"
+    color_vino = "#800020"  # Código hexadecimal para un color vino oscuro
+
+    # Generar colores en escala de grises para los demás semestres
+    semestres_grises = [s for s in semestres_unicos if s != "202520"]
+    num_grises = len(semestres_grises)
+
+    if num_grises > 0:
+        # Generar una lista de colores en escala de grises
+        # Desde '#D3D3D3' (lightgray) hasta '#000000' (black)
+        grises = generar_grises(num_grises, inicio=211, fin=0)
+    else:
+        grises = []
+
+    # Crear el mapa de colores
+    colores_semestre = {}
+    for i, semestre in enumerate(semestres_unicos):
+        if semestre == "202520":
+            colores_semestre[semestre] = color_vino
+        else:
+            colores_semestre[semestre] = grises[i] if i < num_grises else "#808080"
+
+    # Límites de los ejes a partir de los extremos ya calculados de cada
+    # rebanada. Las variaciones ya vienen en porcentaje desde la carga.
+    limites = [rebanada["limites"] for _, rebanada in rebanadas]
+    x_min, x_max = calcular_paddings(
+        min(l[0] for l in limites), max(l[1] for l in limites)
+    )
+    y_min, y_max = calcular_paddings(
+        min(l[2] for l in limites), max(l[3] for l in limites)
+    )
+
+    # Añadir puntos al gráfico con tooltips formateados y colores por semestre
+    for semestre, rebanada in rebanadas:
+        fig.add_trace(
+            go.Scatter(
+                x=rebanada["x"],
+                y=rebanada["y"],
+                mode="markers+text",
+                marker=dict(
+                    size=rebanada["enrollment"],  # Tamaño según Enrollment
+                    sizemode="area",
+                    sizeref=sizeref,
+                    sizemin=4,
+                    color=colores_semestre[semestre],  # Color por semestre
+                    line=dict(width=1, color="DarkSlateGrey"),
+                ),
+                text=rebanada["carrera"],  # Solo la carrera en el texto
+                textposition="top center",
+                # Agregar el semestre como customdata
+                customdata=[semestre] * len(rebanada["carrera"]),
+                hovertemplate=(
+                    "<b>Carrera:</b> %{text}<br>"
+                    "<b>Semestre:</b> %{customdata}<br>"
+                    "<b>Variación de Enrollment:</b> %{x:.2f}%<br>"
+                    "<b>Variación de Ingresos:</b> %{y:.2f}%<br>"
+                    "<extra></extra>"
+                ),
+                name=f"Semestre {semestre}",
+            )
+        )
+
+    # Añadir líneas para dividir los cuadrantes
+    fig.add_shape(
+        type="line",
+        x0=0,
+        y0=y_min,
+        x1=0,
+        y1=y_max,
+        line=dict(color="Black", dash="dash"),
+    )
+    fig.add_shape(
+        type="line",
+        x0=x_min,
+        y0=0,
+        x1=x_max,
+        y1=0,
+        line=dict(color="Black", dash="dash"),
+    )
+
+    # Configurar el layout del gráfico
+    fig.update_layout(
+        xaxis_title="Variación de Enrollment (%)",
+        yaxis_title="Variación de Ingresos (%)",
+        showlegend=True,
+        legend_title="Semestre",
+        template="plotly_white",
+        width=1000,
+        height=700,
+        xaxis=dict(
+            range=[x_min, x_max],
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor="White",
+        ),
+        yaxis=dict(
+            range=[y_min, y_max],
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor="White",
+        ),
+    )
+    return fig
+
+
+# =============================================================================
+# Participación (gráfico de pastel)
+# =============================================================================
+# Definir función para mapear ENROLLMENT a escala de grises
+def map_to_grayscale(value, min_val, max_val):
+    if max_val == min_val:
+        gray_level = 169  # Valor por defecto si no hay variación
+    else:
+        # Normalizar el valor entre 0 y 1
+        norm = (value - min_val) / (max_val - min_val)
+        # Invertir para que mayor participación sea más oscuro
+        gray_level = int(255 * (1 - norm) * 0.6) + 50  # Ajusta según preferencia
+    return f"rgb({gray_level}, {gray_level}, {gray_level})"
+
+
+def figura_participacion(df_agrupado, columna, titulo):
+    # Obtener valores mínimos y máximos de ENROLLMENT
+    min_enrollment = df_agrupado["ENROLLMENT"].min()
+    max_enrollment = df_agrupado["ENROLLMENT"].max()
+
+    # Asignar colores: vino para la mayor participación, grises para el resto
+    colors = []
+    for enrollment in df_agrupado["ENROLLMENT"]:
+        if enrollment == max_enrollment:
+            colors.append("#8d002e")
+        else:
+            colors.append(map_to_grayscale(enrollment, min_enrollment, max_enrollment))
+
+    # Crear un mapeo de colores para cada categoría
+    color_map = {
+        categoria: color for categoria, color in zip(df_agrupado[columna], colors)
+    }
+
+    # plotly.express es la importación más pesada; solo se carga para los pasteles
+    import plotly.express as px
+
+    # Crear el gráfico de pastel usando Plotly con colores personalizados
+    return px.pie(
+        df_agrupado,
+        values="ENROLLMENT",
+        names=columna,
+        hole=0.3,
+        color=columna,
+        color_discrete_map=color_map,
+        title=titulo,
+    )
+
+
+# =============================================================================
+# Marketshare
+# =============================================================================
+# Función para interpolar de celeste a azul fuerte
+def interpolate_blue(intensity):
+    r = int(204 + (0 - 204) * intensity)
+    g = int(229 + (76 - 229) * intensity)
+    b = int(255 + (153 - 255) * intensity)
+    return f"rgb({r}, {g}, {b})"
+
+
+def figura_marketshare(df_agrupado, min_year, max_year):
+    import plotly.graph_objects as go
+
+    # Crear la figura
+    fig = go.Figure()
+
+    # Calcular el orden global de universidades (de menor a mayor participación acumulada)
+    orden_universidades = (
+        df_agrupado.groupby("UNIVERSIDAD")["PARTICIPACION"]
+        .sum()
+        .sort_values()
+        .index.tolist()
+    )
+
+    # Obtener los años únicos
+    años = df_agrupado["AÑO"].unique()
+
+    # Dibujar barras para cada año
+    for año in años:
+        df_year = df_agrupado[df_agrupado["AÑO"] == año]
+
+        # Calcular la intensidad basada en el año (año mayor = azul más fuerte)
+        intensity = (
+            (año - min_year) / (max_year - min_year) if max_year != min_year else 1
+        )
+        blue_color = interpolate_blue(intensity)
+        colors = [blue_color] * len(df_year)
+
+        fig.add_trace(
+            go.Bar(
+                x=df_year["PARTICIPACION"],
+                y=df_year["UNIVERSIDAD"],
+                marker_color=colors,
+                orientation="h",
+                name=f"Año {año}",
+            )
+        )
+
+    # Configurar el layout aplicando el orden global en el eje Y
+    fig.update_layout(
+        barmode="group",
+        title="Participación por Universidad y Año",
+        xaxis_title="Participación",
+        yaxis_title="Universidades",
+        template="plotly_white",
+        height=700,
+        yaxis=dict(categoryorder="array", categoryarray=orden_universidades),
+        legend=dict(traceorder="reversed"),
+    )
+    return fig
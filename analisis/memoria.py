@@ -0,0 +1,238 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+
+# Tamaño profundo aproximado de un objeto en bytes. Los objetos compartidos se
+# cuentan una sola vez.
+def tamano(obj, vistos=None):
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            tamano(clave, vistos) + tamano(valor, vistos)
+            for clave, valor in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(tamano(item, vistos) for item in obj)
+    # Figuras de plotly: lo que ocupan es su representación en dicts y arrays
+    if hasattr(obj, "to_plotly_json"):
+        return tamano(obj.to_plotly_json(), vistos)
+    # DataFrames de Polars (analisis.motor_polars)
+    if hasattr(obj, "estimated_size"):
+        return int(obj.estimated_size())
+    return sys.getsizeof(obj)
+
+
+# =============================================================================
+# Caché de resultados derivados
+# =============================================================================
+# Alternativa a st.cache_data que se puede inspeccionar: cada entrada guarda
+# su tamaño, aciertos, fecha de creación y versión del archivo de origen. Por
+# convención el primer argumento de la función es la versión del archivo
+# (datos.version_archivo); al guardar una versión nueva se descartan las
+# entradas de versiones anteriores. Los valores son compartidos entre sesiones:
+# no deben modificarse.
+#
+# Con `afectada(args, tocadas)` la caché sobrevive a un cambio de versión:
+# cuando datos detecta qué filas cambiaron, las entradas a las que no afectan
+# pasan a la versión nueva (ver migrar) y solo se recalculan las demás.
+_caches = {}
+_bloqueo = threading.Lock()
+
+
+def registrar(nombre, max_entradas=None, max_bytes=None, afectada=None):
+    with _bloqueo:
+        return _caches.setdefault(
+            nombre,
+            {
+                "entradas": OrderedDict(),
+                "max_entradas": max_entradas,
+                "max_bytes": max_bytes,
+                "afectada": afectada,
+            },
+        )
+
+
+def memorizar(nombre, max_entradas=None, max_bytes=None, afectada=None):
+    cache = registrar(nombre, max_entradas, max_bytes, afectada)
+
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args):
+            with _bloqueo:
+                entrada = _buscar(cache, args)
+            if entrada is not None:
+                return entrada["valor"]
+
+            valor = funcion(*args)
+            _guardar(cache, args, valor, args[0] if args else None, reemplaza=True)
+            return valor
+
+        return envoltura
+
+    return decorador
+
+
+# Acceso directo para valores que no salen de una función memorizable, como
+# las conversiones de analisis.motor_polars. La caché debe estar registrada.
+# Sin versión, las entradas no se descartan al cambiar el archivo.
+def consultar(nombre, clave):
+    with _bloqueo:
+        entrada = _buscar(_cache(nombre), clave)
+    return None if entrada is None else entrada["valor"]
+
+
+def guardar(nombre, clave, valor, version=None):
+    _guardar(_cache(nombre), clave, valor, version)
+
+
+def descartar(nombre, clave):
+    with _bloqueo:
+        _caches[nombre]["entradas"].pop(clave, None)
+
+
+def _buscar(cache, clave):
+    entrada = cache["entradas"].get(clave)
+    if entrada is not None:
+        entrada["aciertos"] += 1
+        entrada["usada"] = time.time()
+        cache["entradas"].move_to_end(clave)
+    return entrada
+
+
+# Con `reemplaza` se descartan las entradas de otras versiones del archivo
+def _guardar(cache, clave, valor, version, reemplaza=False):
+    ahora = time.time()
+    entrada = {
+        "valor": valor,
+        "version": version,
+        "bytes": tamano(valor),
+        "aciertos": 0,
+        "creada": ahora,
+        "usada": ahora,
+    }
+    with _bloqueo:
+        entradas = cache["entradas"]
+        if reemplaza:
+            for c in [c for c, e in entradas.items() if e["version"] != version]:
+                del entradas[c]
+        entradas[clave] = entrada
+        _recortar(cache)
+
+
+# Llamada por datos cuando una tabla pasa de `version_anterior` a
+# `version_nueva` y se conocen las filas tocadas. Devuelve cuántas entradas se
+# conservaron y cuántas se invalidaron.
+def migrar(version_anterior, version_nueva, tocadas):
+    conservadas = invalidadas = 0
+    with _bloqueo:
+        for cache in _caches.values():
+            entradas = cache["entradas"]
+            for args in [
+                a for a, e in entradas.items() if e["version"] == version_anterior
+            ]:
+                entrada = entradas.pop(args)
+                if cache["afectada"] is None or cache["afectada"](args, tocadas):
+                    invalidadas += 1
+                    continue
+                entrada["version"] = version_nueva
+                entradas[(version_nueva,) + args[1:]] = entrada
+                conservadas += 1
+    return conservadas, invalidadas
+
+
+# Descarta las entradas menos usadas hasta respetar los límites de la caché
+def _recortar(cache):
+    entradas = cache["entradas"]
+    while entradas and (
+        (cache["max_entradas"] is not None and len(entradas) > cache["max_entradas"])
+        or (
+            cache["max_bytes"] is not None
+            and sum(e["bytes"] for e in entradas.values()) > cache["max_bytes"]
+        )
+    ):
+        entradas.popitem(last=False)
+
+
+def inventario():
+    ahora = time.time()
+    filas = []
+    with _bloqueo:
+        for nombre, cache in _caches.items():
+            for clave, entrada in cache["entradas"].items():
+                filas.append(
+                    {
+                        "cache": nombre,
+                        "clave": repr(clave),
+                        "version": entrada["version"],
+                        "bytes": entrada["bytes"],
+                        "aciertos": entrada["aciertos"],
+                        "edad_s": ahora - entrada["creada"],
+                        "inactiva_s": ahora - entrada["usada"],
+                    }
+                )
+    return filas
+
+
+def limites():
+    with _bloqueo:
+        return {
+            nombre: {
+                "max_entradas": cache["max_entradas"],
+                "max_bytes": cache["max_bytes"],
+            }
+            for nombre, cache in _caches.items()
+        }
+
+
+def _cache(nombre):
+    if nombre not in _caches:
+        raise ValueError(
+            f"Caché desconocida: '{nombre}'. Disponibles: {', '.join(_caches) or 'ninguna'}"
+        )
+    return _caches[nombre]
+
+
+# Sin `clave` se vacía la caché completa. Devuelve cuántas entradas se quitaron.
+def desalojar(nombre, clave=None):
+    with _bloqueo:
+        entradas = _cache(nombre)["entradas"]
+        if clave is None:
+            cantidad = len(entradas)
+            entradas.clear()
+            return cantidad
+        for c in [c for c in entradas if repr(c) == clave]:
+            del entradas[c]
+            return 1
+    return 0
+
+
+# Valor por defecto de fijar_limite: el límite omitido no cambia
+SIN_CAMBIO = object()
+
+
+# None quita el límite correspondiente
+def fijar_limite(nombre, max_entradas=SIN_CAMBIO, max_bytes=SIN_CAMBIO):
+    with _bloqueo:
+        cache = _cache(nombre)
+        if max_entradas is not SIN_CAMBIO:
+            cache["max_entradas"] = max_entradas
+        if max_bytes is not SIN_CAMBIO:
+            cache["max_bytes"] = max_bytes
+        _recortar(cache)
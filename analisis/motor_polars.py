@@ -0,0 +1,99 @@
+# Motor Polars de las agregaciones (ver agregaciones.motor).
+#
+# Cada agregación es un plan perezoso de Polars sobre la tabla completa: los
+# filtros entran en el plan, así el optimizador los aplica antes de agrupar y
+# solo lee las columnas que necesita, y la ejecución usa todos los núcleos. El
+# resultado vuelve como DataFrame de pandas con la misma forma, tipos y orden
+# que devuelve el motor pandas, que es lo que esperan los gráficos.
+import weakref
+
+try:
+    import polars as pl
+except ImportError as error:
+    raise ImportError(
+        "MOTOR_AGREGACIONES=polars requiere el paquete polars: pip install polars"
+    ) from error
+
+from analisis import memoria
+
+# Tablas ya convertidas, por id del DataFrame de pandas. Las tablas de
+# analisis.datos se comparten entre sesiones, así que cada una se convierte una
+# sola vez; la conversión se descarta cuando la tabla sale de la caché. Viven
+# en una caché de memoria para que el inventario las cuente y se puedan
+# desalojar o limitar como las demás; una tabla desalojada se vuelve a
+# convertir en la siguiente consulta.
+CACHE = "polars_convertidas"
+memoria.registrar(CACHE)
+
+
+def _plan(df):
+    clave = id(df)
+    marco = memoria.consultar(CACHE, clave)
+    if marco is None:
+        marco = pl.from_pandas(df)
+        memoria.guardar(CACHE, clave, marco)
+        weakref.finalize(df, memoria.descartar, CACHE, clave)
+    return marco.lazy()
+
+
+# Misma semántica que agregaciones.filtrar: None o una lista vacía no filtran.
+# Como en pandas, las filas con claves de agrupación nulas no se agrupan.
+def _filtrar(plan, filtros):
+    for columna, valores in (filtros or {}).items():
+        if valores:
+            plan = plan.filter(pl.col(columna).is_in(list(valores)))
+    return plan
+
+
+def participacion_enrollment(df, columna, semestres=None, facultades=None):
+    plan = _plan(df)
+    if facultades is not None:
+        plan = plan.filter(pl.col("FACULTAD").is_in(list(facultades)))
+    if semestres is not None:
+        plan = plan.filter(pl.col("SEMESTRE").is_in(list(semestres)))
+    return (
+        plan.drop_nulls(columna)
+        .group_by(columna)
+        .agg(pl.col("ENROLLMENT").sum())
+        .sort(columna)
+        .collect()
+        .to_pandas()
+    )
+
+
+def participacion_universidades(df, filtros=None):
+    return (
+        _filtrar(_plan(df), filtros)
+        .drop_nulls(["AÑO", "UNIVERSIDAD"])
+        .group_by(["AÑO", "UNIVERSIDAD"])
+        .agg(pl.col("MATRICULADOS").sum())
+        .with_columns(
+            PARTICIPACION=pl.col("MATRICULADOS")
+            / pl.col("MATRICULADOS").sum().over("AÑO")
+        )
+        .sort(["AÑO", "UNIVERSIDAD"])
+        .collect()
+        .to_pandas()
+    )
+
+
+# Sin las filas de FACULTAD nula, como el motor pandas. Se agrupa en Polars y
+# solo el resultado, de pocas filas, se pasa a tablas AÑO x NIVEL con pandas
+def instituciones_y_matriculados(df, filtros=None):
+    agrupado = (
+        _filtrar(_plan(df), filtros)
+        .drop_nulls(["AÑO", "NIVEL", "FACULTAD"])
+        .group_by(["AÑO", "NIVEL"])
+        .agg(
+            pl.col("UNIVERSIDAD").drop_nulls().n_unique().cast(pl.Int64),
+            pl.col("MATRICULADOS").sum(),
+        )
+        .collect()
+        .to_pandas()
+        .set_index(["AÑO", "NIVEL"])
+        .sort_index()
+    )
+    return (
+        agrupado["UNIVERSIDAD"].unstack(fill_value=0).sort_index(),
+        agrupado["MATRICULADOS"].unstack(fill_value=0).sort_index(),
+    )
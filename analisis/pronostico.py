@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+MODELOS = {
+    "lineal": "Tendencia lineal",
+    "log-lineal": "Crecimiento log-lineal",
+    "suavizado": "Suavizado exponencial (Holt)",
+}
+
+# Cuadrantes de la matriz BCG según el signo de las variaciones proyectadas
+# (eje x: variación de enrollment, eje y: variación de ingresos).
+CUADRANTES = {
+    (True, True): "Estrella",
+    (False, True): "Vaca lechera",
+    (True, False): "Interrogante",
+    (False, False): "Perro",
+}
+
+# Mínimo de semestres observados para ajustar una tendencia
+MIN_OBSERVACIONES = 3
+
+
+# =============================================================================
+# Utilidades de semestres (AAAA10 / AAAA20)
+# =============================================================================
+def siguientes_semestres(ultimo, horizonte):
+    anio, periodo = divmod(int(ultimo), 100)
+    semestres = []
+    for _ in range(horizonte):
+        if periodo == 10:
+            periodo = 20
+        else:
+            anio, periodo = anio + 1, 10
+        semestres.append(anio * 100 + periodo)
+    return semestres
+
+
+# Pasa la hoja PREGRADO a matrices (carreras x semestres). Los semestres sin
+# registro quedan como NaN para que los ajustes los ignoren.
+def apilar_series(df):
+    df = df.assign(SEMESTRE=df["SEMESTRE"].astype(int))
+    tabla = df.pivot_table(
+        index=["FACULTAD", "CARRERA"],
+        columns="SEMESTRE",
+        values=["ENROLLMENT", "INGRESOS"],
+        aggfunc="sum",
+    ).sort_index(axis=1)
+    semestres = np.array(
+        sorted(tabla.columns.get_level_values("SEMESTRE").unique()), dtype=int
+    )
+    enrollment = tabla["ENROLLMENT"].reindex(columns=semestres).to_numpy(float)
+    ingresos = tabla["INGRESOS"].reindex(columns=semestres).to_numpy(float)
+    return tabla.index, semestres, enrollment, ingresos
+
+
+# =============================================================================
+# Modelos: cada uno recibe Y (n_series x n_semestres) y devuelve los valores
+# proyectados para los `horizonte` semestres siguientes (n_series x horizonte).
+# =============================================================================
+def _disenio(semestres):
+    # Tiempo en semestres consecutivos y variable indicadora del periodo 20
+    anios, periodos = np.divmod(semestres, 100)
+    t = (anios - anios.min()) * 2 + (periodos == 20)
+    return np.column_stack([np.ones(len(t)), t, (periodos == 20).astype(float)])
+
+
+# Mínimos cuadrados ponderados para todas las series a la vez: la máscara de
+# observaciones actúa como peso, así cada serie usa solo sus semestres válidos.
+def _minimos_cuadrados(X, Y, mascara):
+    W = mascara.astype(float)
+    Y = np.where(mascara, Y, 0.0)
+    XtWX = np.einsum("nt,ti,tj->nij", W, X, X)
+    XtWy = np.einsum("nt,ti,nt->ni", W, X, Y)
+    return np.einsum("nij,nj->ni", np.linalg.pinv(XtWX), XtWy)
+
+
+def _tendencia(Y, semestres, horizonte, logaritmica):
+    X = _disenio(semestres)
+    futuros = np.array(siguientes_semestres(semestres[-1], horizonte))
+    anios, periodos = np.divmod(futuros, 100)
+    anio_base = semestres.min() // 100
+    X_futuro = np.column_stack(
+        [
+            np.ones(horizonte),
+            (anios - anio_base) * 2 + (periodos == 20),
+            (periodos == 20).astype(float),
+        ]
+    )
+
+    if logaritmica:
+        mascara = np.isfinite(Y) & (Y > 0)
+        Y = np.log(np.where(mascara, Y, 1.0))
+    else:
+        mascara = np.isfinite(Y)
+
+    beta = _minimos_cuadrados(X, Y, mascara)
+    proyeccion = beta @ X_futuro.T
+    if logaritmica:
+        proyeccion = np.exp(proyeccion)
+
+    proyeccion[mascara.sum(axis=1) < MIN_OBSERVACIONES] = np.nan
+    return proyeccion
+
+
+# Holt (nivel + tendencia) aplicado por separado a la serie de periodos 10 y a
+# la de periodos 20, lo que respeta la estacionalidad semestral. El bucle
+# recorre años, no carreras: cada paso actualiza todas las series.
+def _holt(Y, semestres, horizonte, alpha=0.5, beta=0.3):
+    futuros = np.array(siguientes_semestres(semestres[-1], horizonte))
+    proyeccion = np.full((Y.shape[0], horizonte), np.nan)
+    periodos = semestres % 100
+
+    for periodo in (10, 20):
+        serie = Y[:, periodos == periodo]
+        nivel = np.full(Y.shape[0], np.nan)
+        tendencia = np.zeros(Y.shape[0])
+        for t in range(serie.shape[1]):
+            obs = serie[:, t]
+            observado = np.isfinite(obs)
+            iniciado = np.isfinite(nivel)
+
+            nuevo = observado & ~iniciado
+            nivel[nuevo] = obs[nuevo]
+
+            act = observado & iniciado
+            nivel_previo = nivel[act]
+            nivel[act] = alpha * obs[act] + (1 - alpha) * (
+                nivel_previo + tendencia[act]
+            )
+            tendencia[act] = (
+                beta * (nivel[act] - nivel_previo) + (1 - beta) * tendencia[act]
+            )
+
+            # Sin observación se avanza con la tendencia vigente
+            hueco = ~observado & iniciado
+            nivel[hueco] = nivel[hueco] + tendencia[hueco]
+
+        pasos = futuros // 100 - semestres[periodos == periodo].max() // 100
+        columnas = futuros % 100 == periodo
+        proyeccion[:, columnas] = nivel[:, None] + tendencia[:, None] * pasos[columnas]
+
+    proyeccion[np.isfinite(Y).sum(axis=1) < MIN_OBSERVACIONES] = np.nan
+    return proyeccion
+
+
+def proyectar(Y, semestres, horizonte, modelo):
+    if modelo == "lineal":
+        proyeccion = _tendencia(Y, semestres, horizonte, logaritmica=False)
+    elif modelo == "log-lineal":
+        proyeccion = _tendencia(Y, semestres, horizonte, logaritmica=True)
+    elif modelo == "suavizado":
+        proyeccion = _holt(Y, semestres, horizonte)
+    else:
+        raise ValueError(f"Modelo de pronóstico desconocido: {modelo}")
+    return np.clip(proyeccion, 0, None)
+
+
+# Variación interanual (mismo periodo del año anterior) del último semestre
+# proyectado, tal como se calculan las columnas "Variación" de la hoja.
+def _variacion_interanual(Y, proyeccion):
+    completa = np.concatenate([Y, proyeccion], axis=1)
+    actual = completa[:, -1]
+    anterior = completa[:, -3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variacion = actual / anterior - 1
+    variacion[~np.isfinite(variacion)] = np.nan
+    return variacion
+
+
+def clasificar_cuadrantes(var_enrollment, var_ingresos):
+    cuadrantes = np.full(len(var_enrollment), "Sin datos", dtype=object)
+    validos = np.isfinite(var_enrollment) & np.isfinite(var_ingresos)
+    for (crece_enr, crece_ing), nombre in CUADRANTES.items():
+        seleccion = (
+            validos
+            & ((var_enrollment >= 0) == crece_enr)
+            & ((var_ingresos >= 0) == crece_ing)
+        )
+        cuadrantes[seleccion] = nombre
+    return cuadrantes
+
+
+# =============================================================================
+# Pronóstico del catálogo completo
+# =============================================================================
+def pronosticar_carreras(df, modelo="lineal", horizonte=1):
+    indice, semestres, enrollment, ingresos = apilar_series(df)
+    futuros = siguientes_semestres(semestres[-1], horizonte)
+
+    proy_enrollment = proyectar(enrollment, semestres, horizonte, modelo)
+    proy_ingresos = proyectar(ingresos, semestres, horizonte, modelo)
+
+    var_enrollment = _variacion_interanual(enrollment, proy_enrollment)
+    var_ingresos = _variacion_interanual(ingresos, proy_ingresos)
+
+    # Cuadrante actual: última variación observada de cada carrera
+    var_enr_actual = _variacion_interanual(enrollment[:, :-1], enrollment[:, -1:])
+    var_ing_actual = _variacion_interanual(ingresos[:, :-1], ingresos[:, -1:])
+
+    resumen = pd.DataFrame(
+        {
+            "ENROLLMENT PROYECTADO": proy_enrollment[:, -1],
+            "INGRESOS PROYECTADOS": proy_ingresos[:, -1],
+            "Variación Enrollment": var_enrollment * 100,
+            "Variación Ingresos": var_ingresos * 100,
+            "CUADRANTE ACTUAL": clasificar_cuadrantes(var_enr_actual, var_ing_actual),
+            "CUADRANTE PROYECTADO": clasificar_cuadrantes(var_enrollment, var_ingresos),
+        },
+        index=indice,
+    ).reset_index()
+    resumen.insert(2, "SEMESTRE", str(futuros[-1]))
+
+    # Historia y proyección en formato largo para los gráficos de detalle
+    columnas = [str(s) for s in semestres] + [str(s) for s in futuros]
+    series = {}
+    for variable, historia, proyeccion in (
+        ("ENROLLMENT", enrollment, proy_enrollment),
+        ("INGRESOS", ingresos, proy_ingresos),
+    ):
+        series[variable] = pd.DataFrame(
+            np.concatenate([historia, proyeccion], axis=1),
+            index=indice,
+            columns=columnas,
+        )
+
+    return resumen, series, [str(s) for s in futuros]
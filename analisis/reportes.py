@@ -0,0 +1,227 @@
+# Generación de reportes sin Streamlit: para cada facultad y carrera exporta la
+# matriz BCG, la participación de carreras y el gráfico de marketshare como HTML
+# independiente, junto con un CSV de los datos agregados de cada gráfico.
+#
+# Uso:
+#     python -m analisis.reportes --salida reportes --procesos 8
+import argparse
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from analisis import agregaciones, datos, graficos
+
+# Datos cargados una sola vez por proceso (ver _inicializar)
+_DATOS = {}
+
+
+# Nombre de carpeta para una facultad o carrera. Se conservan las tildes porque
+# los datos traen carreras que solo se distinguen por ellas.
+def slug(texto):
+    texto = unicodedata.normalize("NFC", str(texto)).lower()
+    return re.sub(r"\W+", "_", texto).strip("_")
+
+
+def _inicializar(pregrado, marketshare, plotlyjs):
+    _DATOS["pregrado"] = pregrado
+    _DATOS["matriz_bcg"] = agregaciones.matriz_bcg(pregrado)
+    _DATOS["marketshare"] = marketshare
+    _DATOS["plotlyjs"] = plotlyjs
+
+
+def _escribir(fig, tabla, ruta_base):
+    ruta_base.parent.mkdir(parents=True, exist_ok=True)
+    fig.write_html(
+        ruta_base.with_suffix(".html"),
+        include_plotlyjs=_DATOS["plotlyjs"],
+        full_html=True,
+    )
+    tabla.to_csv(ruta_base.with_suffix(".csv"), index=False)
+    return [ruta_base.with_suffix(".html"), ruta_base.with_suffix(".csv")]
+
+
+# =============================================================================
+# Reportes individuales (se ejecutan dentro de los procesos del pool)
+# =============================================================================
+def _reporte_bcg(ruta_base, facultad, carrera=None):
+    carreras = [carrera] if carrera else None
+    matriz = _DATOS["matriz_bcg"]
+    rebanadas = agregaciones.seleccion_bcg(matriz, facultad, carreras=carreras)
+    if not rebanadas:
+        return []
+    fig = graficos.figura_bcg(rebanadas, matriz["sizeref"])
+    fig.update_layout(title=f"Matriz BCG - {carrera or facultad}")
+    columnas = ["SEMESTRE", "CARRERA", "ENROLLMENT"]
+    columnas += ["Variación Enrollment", "Variación Ingresos"]
+    df_filtrado = agregaciones.filtrar_bcg(_DATOS["pregrado"], facultad, carreras)
+    return _escribir(fig, df_filtrado[columnas], ruta_base)
+
+
+def _reporte_participacion(ruta_base, columna, semestre, facultad=None):
+    df_agrupado = agregaciones.participacion_enrollment(
+        _DATOS["pregrado"],
+        columna,
+        semestres=[semestre],
+        facultades=[facultad] if facultad else None,
+    )
+    if df_agrupado.empty:
+        return []
+    titulo = f"Participación por {columna.capitalize()} - {semestre}"
+    fig = graficos.figura_participacion(df_agrupado, columna, titulo)
+    return _escribir(fig, df_agrupado, ruta_base)
+
+
+def _reporte_marketshare(ruta_base, facultad, carrera=None):
+    df_agrupado = agregaciones.participacion_universidades(
+        _DATOS["marketshare"],
+        {"FACULTAD": [facultad], "CARRERA": [carrera] if carrera else None},
+    )
+    if df_agrupado.empty:
+        return []
+    fig = graficos.figura_marketshare(
+        df_agrupado, df_agrupado["AÑO"].min(), df_agrupado["AÑO"].max()
+    )
+    fig.update_layout(
+        title=f"Participación por Universidad y Año - {carrera or facultad}"
+    )
+    return _escribir(fig, df_agrupado, ruta_base)
+
+
+_GENERADORES = {
+    "bcg": _reporte_bcg,
+    "participacion": _reporte_participacion,
+    "marketshare": _reporte_marketshare,
+}
+
+
+def _generar(tarea):
+    tipo, ruta_base, argumentos = tarea
+    inicio = time.perf_counter()
+    archivos = _GENERADORES[tipo](Path(ruta_base), *argumentos)
+    return tarea, time.perf_counter() - inicio, archivos
+
+
+# =============================================================================
+# Planificación de tareas
+# =============================================================================
+def planificar(pregrado, marketshare, salida, semestre):
+    salida = Path(salida)
+    tareas = [
+        (
+            "participacion",
+            salida / "enrollment" / "participacion_facultades",
+            ("FACULTAD", semestre),
+        )
+    ]
+
+    for facultad, df_facultad in pregrado.groupby("FACULTAD"):
+        carpeta = salida / "enrollment" / slug(facultad)
+        tareas.append(("bcg", carpeta / "bcg", (facultad,)))
+        tareas.append(
+            (
+                "participacion",
+                carpeta / "participacion_carreras",
+                ("CARRERA", semestre, facultad),
+            )
+        )
+        for carrera in sorted(df_facultad["CARRERA"].unique()):
+            tareas.append(
+                (
+                    "bcg",
+                    carpeta / "carreras" / slug(carrera) / "bcg",
+                    (facultad, carrera),
+                )
+            )
+
+    # Igual que en MatriculadosCarrera, se descartan las facultades vacías
+    validas = marketshare["FACULTAD"].map(
+        lambda f: isinstance(f, str) and f.strip() != ""
+    )
+    for facultad, df_facultad in marketshare[validas].groupby("FACULTAD"):
+        carpeta = salida / "marketshare" / slug(facultad)
+        tareas.append(("marketshare", carpeta / "marketshare", (facultad,)))
+        for carrera in sorted(df_facultad["CARRERA"].unique()):
+            tareas.append(
+                (
+                    "marketshare",
+                    carpeta / "carreras" / slug(carrera) / "marketshare",
+                    (facultad, carrera),
+                )
+            )
+
+    return [(tipo, str(ruta), argumentos) for tipo, ruta, argumentos in tareas]
+
+
+def generar_reportes(
+    salida, procesos=None, semestre=None, plotlyjs="cdn", informar=print
+):
+    inicio = time.perf_counter()
+    pregrado = datos.leer_pregrado()
+    marketshare = datos.leer_marketshare()
+    semestre = str(semestre or pregrado["SEMESTRE"].max())
+    duracion_carga = time.perf_counter() - inicio
+    informar(f"Datos cargados en {duracion_carga:.2f}s")
+
+    tareas = planificar(pregrado, marketshare, salida, semestre)
+    tiempos = []
+    total_archivos = 0
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_inicializar,
+        initargs=(pregrado, marketshare, plotlyjs),
+    ) as pool:
+        futuros = [pool.submit(_generar, tarea) for tarea in tareas]
+        for i, futuro in enumerate(as_completed(futuros), start=1):
+            (tipo, ruta, _), duracion, archivos = futuro.result()
+            tiempos.append((duracion, ruta))
+            total_archivos += len(archivos)
+            informar(f"[{i}/{len(tareas)}] {tipo:<13} {ruta} ({duracion:.2f}s)")
+
+    total = time.perf_counter() - inicio
+    suma = sum(duracion for duracion, _ in tiempos)
+    informar("")
+    informar(f"Reportes: {len(tareas)}  Archivos: {total_archivos}")
+    informar(
+        f"Tiempo total: {total:.2f}s  (suma por reporte: {suma:.2f}s, carga: {duracion_carga:.2f}s)"
+    )
+    informar("Reportes más lentos:")
+    for duracion, ruta in sorted(tiempos, reverse=True)[:5]:
+        informar(f"  {duracion:.2f}s  {ruta}")
+    return tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporta los dashboards de cada facultad y carrera a HTML y CSV."
+    )
+    parser.add_argument("--salida", default="reportes", help="Carpeta de salida")
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=os.cpu_count(),
+        help="Número de procesos en paralelo",
+    )
+    parser.add_argument(
+        "--semestre",
+        help="Semestre de los gráficos de participación (por defecto, el último)",
+    )
+    parser.add_argument(
+        "--plotlyjs",
+        choices=["cdn", "incluido"],
+        default="cdn",
+        help="Cargar plotly.js desde la CDN o incluirlo en cada HTML",
+    )
+    args = parser.parse_args(argv)
+    generar_reportes(
+        args.salida,
+        procesos=args.procesos,
+        semestre=args.semestre,
+        plotlyjs="cdn" if args.plotlyjs == "cdn" else True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# API HTTP de solo lectura con las agregaciones del dashboard.
+#
+# Sirve en JSON o CSV los mismos cálculos que las páginas, a partir de la misma
+# capa de datos (analisis.datos) y sin sesiones ni render de Streamlit. Cada
+# filtro es un parámetro de consulta que se puede repetir
+# (?anio=2022&anio=2023); un filtro omitido no filtra. El formato se elige con
+# ?formato=csv o con la cabecera Accept: text/csv; por defecto es JSON.
+#
+# Las respuestas se guardan por versión del archivo de origen y llevan un ETag
+# calculado a partir de su contenido. Un cliente que repite la consulta con
+# If-None-Match recibe 304 sin que se recalcule nada. Cuando llega una versión
+# nueva de la base de marketshare solo se recalculan las consultas cuyos
+# filtros alcanzan filas que cambiaron (ver analisis.cambios); las demás
+# conservan su respuesta y su ETag.
+#
+# Uso:
+#     python api.py --puerto 8600 [--motor polars]
+#
+# Rutas y parámetros:
+#     GET /marketshare/participacion  anio region financiamiento nivel facultad carrera
+#     GET /marketshare/matriculados   nivel anio facultad carrera
+#     GET /enrollment/bcg             facultad (obligatorio) carrera semestre
+#     GET /enrollment/participacion   columna (FACULTAD o CARRERA) semestre facultad
+#     GET /enrollment/crecimiento     periodo (10 o 20) facultad carrera variable
+#
+# Como la página 3, /marketshare/matriculados no cuenta las filas sin FACULTAD.
+import argparse
+import hashlib
+from contextlib import asynccontextmanager
+
+import pandas as pd
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from analisis import agregaciones, cambios, datos, memoria
+
+
+# =============================================================================
+# Consultas: reciben un dict parámetro -> lista de valores y devuelven un
+# DataFrame
+# =============================================================================
+def _enteros(valores, nombre):
+    try:
+        return [int(v) for v in valores]
+    except ValueError:
+        raise ValueError(f"'{nombre}' debe ser un número entero")
+
+
+def _unico(consulta, nombre):
+    valores = consulta.get(nombre, [])
+    if len(valores) != 1:
+        raise ValueError(f"Se requiere exactamente un valor para '{nombre}'")
+    return valores[0]
+
+
+def _filtros_marketshare(consulta):
+    return {
+        "AÑO": _enteros(consulta.get("anio", []), "anio"),
+        "REGION": consulta.get("region"),
+        "FINANCIAMIENTO": consulta.get("financiamiento"),
+        "NIVEL": consulta.get("nivel"),
+        "FACULTAD": consulta.get("facultad"),
+        "CARRERA": consulta.get("carrera"),
+    }
+
+
+def participacion_marketshare(consulta):
+    return agregaciones.participacion_universidades(
+        datos.leer_marketshare(), _filtros_marketshare(consulta)
+    )
+
+
+def matriculados(consulta):
+    instituciones, matriculados = agregaciones.instituciones_y_matriculados(
+        datos.leer_marketshare(), _filtros_marketshare(consulta)
+    )
+    return pd.concat(
+        {
+            "INSTITUCIONES": instituciones.stack(),
+            "MATRICULADOS": matriculados.stack(),
+        },
+        axis=1,
+    ).reset_index()
+
+
+def bcg(consulta):
+    return agregaciones.filtrar_bcg(
+        datos.leer_pregrado(),
+        _unico(consulta, "facultad"),
+        carreras=consulta.get("carrera"),
+        semestres=consulta.get("semestre"),
+    )
+
+
+def participacion_enrollment(consulta):
+    columna = _unico(consulta, "columna")
+    if columna not in ("FACULTAD", "CARRERA"):
+        raise ValueError("'columna' debe ser FACULTAD o CARRERA")
+    return agregaciones.participacion_enrollment(
+        datos.leer_pregrado(),
+        columna,
+        semestres=consulta.get("semestre"),
+        facultades=consulta.get("facultad"),
+    )
+
+
+def crecimiento(consulta):
+    periodo = _enteros([_unico(consulta, "periodo")], "periodo")[0]
+    if periodo not in datos.RANGOS_CRECIMIENTO:
+        raise ValueError(f"'periodo' debe ser uno de {list(datos.RANGOS_CRECIMIENTO)}")
+    return agregaciones.filtrar(
+        datos.leer_crecimiento(periodo),
+        {
+            "Facultad": consulta.get("facultad"),
+            "Carrera": consulta.get("carrera"),
+            "Variable": consulta.get("variable"),
+        },
+    )
+
+
+# Ruta -> (archivo de origen, parámetros admitidos, consulta)
+RUTAS = {
+    "/marketshare/participacion": (
+        datos.RUTA_MARKETSHARE,
+        ("anio", "region", "financiamiento", "nivel", "facultad", "carrera"),
+        participacion_marketshare,
+    ),
+    "/marketshare/matriculados": (
+        datos.RUTA_MARKETSHARE,
+        ("nivel", "anio", "facultad", "carrera"),
+        matriculados,
+    ),
+    "/enrollment/bcg": (
+        datos.RUTA_ENROLLMENT,
+        ("facultad", "carrera", "semestre"),
+        bcg,
+    ),
+    "/enrollment/participacion": (
+        datos.RUTA_ENROLLMENT,
+        ("columna", "semestre", "facultad"),
+        participacion_enrollment,
+    ),
+    "/enrollment/crecimiento": (
+        datos.RUTA_ENROLLMENT,
+        ("periodo", "facultad", "carrera", "variable"),
+        crecimiento,
+    ),
+}
+
+
+# =============================================================================
+# Respuestas
+# =============================================================================
+TIPOS = {"json": "application/json", "csv": "text/csv; charset=utf-8"}
+
+
+# Devuelve (cuerpo, etag)
+def _cuerpo(version, ruta, consulta, formato):
+    df = RUTAS[ruta][2](dict(consulta))
+    if formato == "csv":
+        cuerpo = df.to_csv(index=False).encode()
+    else:
+        cuerpo = df.to_json(orient="records", force_ascii=False).encode()
+    return cuerpo, f'"{hashlib.sha1(cuerpo).hexdigest()}"'
+
+
+def _afecta_marketshare(args, tocadas):
+    _, _, consulta, _ = args
+    return cambios.afecta(_filtros_marketshare(dict(consulta)), tocadas)
+
+
+# Una caché por archivo, porque memorizar descarta las entradas de otras
+# versiones y las rutas de cada archivo cambian de versión por separado
+_CUERPOS = {
+    datos.RUTA_ENROLLMENT: memoria.memorizar("api_enrollment", max_entradas=256)(
+        _cuerpo
+    ),
+    datos.RUTA_MARKETSHARE: memoria.memorizar(
+        "api_marketshare", max_entradas=256, afectada=_afecta_marketshare
+    )(_cuerpo),
+}
+
+
+# Versión vigente del archivo. Antes se releen las tablas desactualizadas para
+# que las respuestas no afectadas por el cambio ya estén migradas.
+def _version(archivo):
+    datos.refrescar(archivo)
+    return datos.version_archivo(archivo)
+
+
+def _formato(request):
+    formato = request.query_params.get("formato")
+    if formato is None:
+        formato = "csv" if "text/csv" in request.headers.get("accept", "") else "json"
+    if formato not in TIPOS:
+        raise ValueError("'formato' debe ser json o csv")
+    return formato
+
+
+def _coincide(etag, if_none_match):
+    etiquetas = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+
+async def atender(request):
+    ruta = request.url.path
+    archivo, admitidos, _ = RUTAS[ruta]
+
+    parametros = {}
+    for nombre, valor in request.query_params.multi_items():
+        if nombre != "formato":
+            parametros.setdefault(nombre, []).append(valor)
+    desconocidos = sorted(set(parametros) - set(admitidos))
+    if desconocidos:
+        return JSONResponse(
+            {"error": f"Parámetros desconocidos: {', '.join(desconocidos)}"},
+            status_code=400,
+        )
+    # Forma canónica de la consulta: el orden de los parámetros no importa
+    consulta = tuple(sorted((k, tuple(v)) for k, v in parametros.items()))
+
+    try:
+        formato = _formato(request)
+        version = await run_in_threadpool(_version, archivo)
+    except ValueError as error:
+        return JSONResponse({"error": str(error)}, status_code=400)
+    except FileNotFoundError:
+        return JSONResponse(
+            {"error": f"El archivo '{archivo.name}' no se encuentra."},
+            status_code=503,
+        )
+
+    # El cálculo con pandas bloquea, así que corre en el pool de hilos y el
+    # bucle de eventos sigue atendiendo otras solicitudes
+    try:
+        cuerpo, etag = await run_in_threadpool(
+            _CUERPOS[archivo], version, ruta, consulta, formato
+        )
+    except ValueError as error:
+        return JSONResponse({"error": str(error)}, status_code=400)
+
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _coincide(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=cabeceras)
+    return Response(cuerpo, media_type=TIPOS[formato], headers=cabeceras)
+
+
+@asynccontextmanager
+async def _ciclo_de_vida(app):
+    # Misma caché de tablas que el dashboard: se llena en segundo plano
+    datos.precalentar()
+    yield
+
+
+app = Starlette(
+    routes=[Route(ruta, atender, methods=["GET"]) for ruta in RUTAS],
+    lifespan=_ciclo_de_vida,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="API JSON/CSV con las agregaciones del dashboard."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8600)
+    parser.add_argument("--motor", choices=agregaciones.MOTORES)
+    args = parser.parse_args(argv)
+    if args.motor:
+        agregaciones.fijar_motor(args.motor)
+    uvicorn.run(app, host=args.host, port=args.puerto)
+
+
+if __name__ == "__main__":
+    main()
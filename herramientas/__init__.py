@@ -0,0 +1 @@
+# Herramientas de desarrollo: pruebas de carga y mediciones de rendimiento.
@@ -0,0 +1,138 @@
+# Medición del arranque en frío del dashboard.
+#
+# Levanta un servidor nuevo, espera a que responda y abre una sesión por el
+# websocket de Streamlit que visita la página principal y cada una de las
+# páginas. Para cada una se mide el tiempo hasta que el servidor termina de
+# enviar la página (script_finished), que es el primer pintado útil que ve el
+# usuario. Compara `streamlit run` con el arranque precalentado de servidor.py.
+#
+# Uso:
+#     python -m herramientas.arranque_en_frio --modos streamlit servidor --repeticiones 3
+#
+# Requiere el paquete `websockets` (incluido con las versiones recientes de
+# Streamlit).
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from herramientas.servidor_local import esperar_salud, puerto_libre, rss_mb
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+COMANDOS = {
+    "streamlit": [
+        sys.executable,
+        "-m",
+        "streamlit",
+        "run",
+        "Crecimiento_Enrollment.py",
+    ],
+    "servidor": [sys.executable, "servidor.py"],
+}
+
+
+def _paginas():
+    # Nombre de URL de cada página: sin el prefijo numérico del archivo
+    nombres = [""]
+    for ruta in sorted((RAIZ / "pages").glob("*.py")):
+        nombres.append(ruta.stem.split("_", 1)[-1])
+    return nombres
+
+
+async def _visitar(puerto, paginas):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    tiempos = {}
+    async with websockets.connect(
+        f"ws://127.0.0.1:{puerto}/_stcore/stream",
+        subprotocols=["streamlit"],
+        max_size=None,
+    ) as ws:
+        for pagina in paginas:
+            mensaje = BackMsg()
+            mensaje.rerun_script.query_string = ""
+            mensaje.rerun_script.page_name = pagina
+            inicio = time.perf_counter()
+            await ws.send(mensaje.SerializeToString())
+            while True:
+                respuesta = ForwardMsg()
+                respuesta.ParseFromString(await ws.recv())
+                tipo = respuesta.WhichOneof("type")
+                if tipo in ("script_finished", "page_not_found"):
+                    break
+            tiempos[pagina or "Crecimiento_Enrollment"] = time.perf_counter() - inicio
+    return tiempos
+
+
+def medir(modo, espera=0.0, timeout=60):
+    puerto = puerto_libre()
+    comando = COMANDOS[modo] + [
+        "--server.headless",
+        "true",
+        "--server.port",
+        str(puerto),
+        "--server.fileWatcherType",
+        "none",
+        "--browser.gatherUsageStats",
+        "false",
+    ]
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_salud(puerto, inicio + timeout)
+        listo = time.perf_counter() - inicio
+        # Tiempo que el servidor queda ocioso antes del primer visitante
+        time.sleep(espera)
+        paginas = asyncio.run(_visitar(puerto, _paginas()))
+        return {"listo": listo, "paginas": paginas, "rss_mb": rss_mb(proceso.pid)}
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mide el tiempo hasta el primer pintado útil tras reiniciar el servidor."
+    )
+    parser.add_argument(
+        "--modos", nargs="+", choices=list(COMANDOS), default=list(COMANDOS)
+    )
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument(
+        "--espera",
+        type=float,
+        default=0.0,
+        help="Segundos entre que el servidor responde y llega el primer visitante",
+    )
+    args = parser.parse_args(argv)
+
+    for modo in args.modos:
+        mediciones = [medir(modo, args.espera) for _ in range(args.repeticiones)]
+        print(f"\n== {modo} (mediana de {args.repeticiones}) ==")
+        listo = statistics.median(m["listo"] for m in mediciones)
+        print(f"  servidor listo:          {listo * 1000:>7.0f} ms")
+        primera = True
+        for pagina in mediciones[0]["paginas"]:
+            duracion = statistics.median(m["paginas"][pagina] for m in mediciones)
+            etiqueta = "primer pintado" if primera else "  luego"
+            print(f"  {etiqueta:<14} {pagina:<24} {duracion * 1000:>7.0f} ms")
+            primera = False
+        total = statistics.median(
+            m["listo"] + args.espera + sum(m["paginas"].values()) for m in mediciones
+        )
+        print(f"  arranque + todas las páginas: {total * 1000:>7.0f} ms")
+        rss = [m["rss_mb"] for m in mediciones if m["rss_mb"] is not None]
+        if rss:
+            print(f"  RSS del servidor:        {statistics.median(rss):>7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
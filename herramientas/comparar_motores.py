@@ -0,0 +1,205 @@
+# Paridad y rendimiento de los motores de agregaciones (pandas y Polars).
+#
+# Primero ejecuta cada agregación con los dos motores sobre las bases reales y
+# sobre una serie de filtros (sin filtro, por año, región, facultad, carrera,
+# combinaciones y selecciones sin filas) y comprueba que devuelven el mismo
+# DataFrame: columnas, índice, tipos y orden, con tolerancia solo en los
+# flotantes. Después repite la paridad y mide los tiempos sobre copias
+# sintéticas de las bases escaladas a más filas. Termina con código 1 si algún
+# resultado difiere.
+#
+# Uso:
+#     python -m herramientas.comparar_motores --escalas 1 10 100 --repeticiones 5
+#
+# Requiere el paquete `polars`. tests/test_motores.py corre la misma paridad
+# con pytest.
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from analisis import agregaciones, datos
+
+
+@contextmanager
+def _motor(nombre):
+    anterior = os.environ.get("MOTOR_AGREGACIONES")
+    os.environ["MOTOR_AGREGACIONES"] = nombre
+    try:
+        yield
+    finally:
+        if anterior is None:
+            del os.environ["MOTOR_AGREGACIONES"]
+        else:
+            os.environ["MOTOR_AGREGACIONES"] = anterior
+
+
+# =============================================================================
+# Casos: (nombre, función sin argumentos que devuelve un DataFrame)
+# =============================================================================
+def _casos(marketshare, pregrado):
+    anios = sorted(marketshare["AÑO"].unique())
+    facultades = list(marketshare["FACULTAD"].dropna().unique())
+    carreras = list(marketshare["CARRERA"].unique())
+    filtros_marketshare = {
+        "sin filtros": {},
+        "último año": {"AÑO": anios[-1:]},
+        "dos años y región": {
+            "AÑO": anios[-2:],
+            "REGION": list(marketshare["REGION"].unique()[:1]),
+        },
+        "facultad": {"FACULTAD": facultades[:1]},
+        "carrera": {"CARRERA": carreras[:1]},
+        "nivel y financiamiento": {
+            "NIVEL": list(marketshare["NIVEL"].unique()[:1]),
+            "FINANCIAMIENTO": list(marketshare["FINANCIAMIENTO"].unique()[:1]),
+        },
+        "sin filas": {"CARRERA": ["(no existe)"]},
+    }
+
+    casos = []
+    for nombre, filtros in filtros_marketshare.items():
+        casos.append(
+            (
+                f"participacion_universidades / {nombre}",
+                lambda f=filtros: agregaciones.participacion_universidades(
+                    marketshare, f
+                ),
+            )
+        )
+        casos.append(
+            (
+                f"instituciones_y_matriculados / {nombre}",
+                lambda f=filtros: pd.concat(
+                    agregaciones.instituciones_y_matriculados(marketshare, f),
+                    keys=["INSTITUCIONES", "MATRICULADOS"],
+                    axis=1,
+                ),
+            )
+        )
+
+    semestres = sorted(pregrado["SEMESTRE"].unique())
+    filtros_pregrado = {
+        "sin filtros": {},
+        "último semestre": {"semestres": semestres[-1:]},
+        "facultad y semestres": {
+            "semestres": semestres[-3:],
+            "facultades": list(pregrado["FACULTAD"].unique()[:1]),
+        },
+        "sin filas": {"semestres": []},
+    }
+    for columna in ("FACULTAD", "CARRERA"):
+        for nombre, filtros in filtros_pregrado.items():
+            casos.append(
+                (
+                    f"participacion_enrollment {columna} / {nombre}",
+                    lambda c=columna, f=filtros: agregaciones.participacion_enrollment(
+                        pregrado, c, **f
+                    ),
+                )
+            )
+    return casos
+
+
+def comprobar_paridad(casos):
+    fallas = 0
+    for nombre, caso in casos:
+        with _motor("pandas"):
+            esperado = caso()
+        with _motor("polars"):
+            obtenido = caso()
+        try:
+            pd.testing.assert_frame_equal(obtenido, esperado, rtol=1e-9)
+        except AssertionError as error:
+            fallas += 1
+            print(f"DIFERENTE  {nombre}\n{error}\n")
+    print(f"Paridad: {len(casos) - fallas}/{len(casos)} casos iguales")
+    return fallas
+
+
+# =============================================================================
+# Datos sintéticos
+# =============================================================================
+# Copia la base `escala` veces. Cada copia renombra las universidades (o las
+# carreras) para que los grupos crezcan con la tabla y perturba los valores
+# para que las sumas no sean múltiplos exactos de la base.
+def escalar(df, escala, columna_renombrada, columna_valor, semilla=0):
+    if escala == 1:
+        return df
+    generador = np.random.default_rng(semilla)
+    copias = []
+    for i in range(escala):
+        copia = df.copy()
+        if i:
+            copia[columna_renombrada] = copia[columna_renombrada] + f" #{i}"
+            factor = generador.uniform(0.5, 1.5, len(copia))
+            copia[columna_valor] = (
+                (copia[columna_valor] * factor).round().astype(df[columna_valor].dtype)
+            )
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+def medir(casos, repeticiones):
+    filas = []
+    for nombre, caso in casos:
+        tiempos = {}
+        for motor in agregaciones.MOTORES:
+            with _motor(motor):
+                # La primera ejecución incluye la conversión a Polars, que se
+                # hace una sola vez por tabla
+                caso()
+                muestras = []
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    caso()
+                    muestras.append(time.perf_counter() - inicio)
+            tiempos[motor] = statistics.median(muestras) * 1000
+        filas.append((nombre, tiempos["pandas"], tiempos["polars"]))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compara los motores pandas y Polars de las agregaciones."
+    )
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    marketshare = datos.leer_marketshare()
+    pregrado = datos.leer_pregrado()
+
+    print("== Bases reales ==")
+    fallas = comprobar_paridad(_casos(marketshare, pregrado))
+
+    for escala in args.escalas:
+        inicio = time.perf_counter()
+        marketshare_escalada = escalar(
+            marketshare, escala, "UNIVERSIDAD", "MATRICULADOS"
+        )
+        pregrado_escalada = escalar(pregrado, escala, "CARRERA", "ENROLLMENT")
+        print(
+            f"\n== Escala x{escala}: {len(marketshare_escalada)} filas de "
+            f"marketshare, {len(pregrado_escalada)} de pregrado "
+            f"({time.perf_counter() - inicio:.1f}s) =="
+        )
+        casos = _casos(marketshare_escalada, pregrado_escalada)
+        fallas += comprobar_paridad(casos)
+        print(f"{'caso':<62} {'pandas ms':>10} {'polars ms':>10} {'razón':>7}")
+        for nombre, pandas_ms, polars_ms in medir(casos, args.repeticiones):
+            print(
+                f"{nombre:<62} {pandas_ms:>10.2f} {polars_ms:>10.2f} "
+                f"{pandas_ms / polars_ms:>6.1f}x"
+            )
+
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+# Prueba de carga con sesiones concurrentes.
+#
+# Para cada nivel de concurrencia se levanta un servidor nuevo con servidor.py
+# (mismo arranque precalentado que en producción) y se abren N sesiones como
+# lo haría el navegador: cada una es un cliente del websocket de Streamlit que
+# recorre filtros realistas de Crecimiento_Enrollment.py y de las páginas,
+# enviando los valores de los widgets y esperando a que el servidor termine
+# cada rerun. Los widgets dentro de fragmentos vuelven a ejecutar solo su
+# fragmento, como en el navegador. Todo el trabajo ocurre en el proceso del
+# servidor, del que se toma también la memoria (RSS), así que la prueba muestra
+# cuándo dejan de ayudar las cachés y cuánto crece la memoria con la
+# concurrencia. Los clientes solo envían mensajes y leen respuestas.
+#
+# Uso:
+#     python -m herramientas.prueba_carga --concurrencia 1 2 4 8 --duracion 20
+#
+# Requiere el paquete `websockets` (incluido con las versiones recientes de
+# Streamlit).
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from analisis import pronostico
+from herramientas.servidor_local import esperar_salud, puerto_libre, rss_mb
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+# =============================================================================
+# Sesión: un cliente del websocket, como una pestaña del navegador
+# =============================================================================
+class _Interrumpida(Exception):
+    pass
+
+
+class _Sesion:
+    def __init__(self, ws, limite, timeout, resultados):
+        self.ws = ws
+        self.limite = limite
+        self.timeout = timeout
+        self.resultados = resultados
+        self.pagina = None
+
+    # Abre la página con sus widgets en los valores por defecto
+    async def abrir(self, pagina):
+        self.pagina = pagina
+        self.estados = {}
+        self.elementos = {}
+        await self._rerun()
+
+    # Cambia el widget con esa etiqueta y espera el rerun que provoca. `valor`
+    # recibe el elemento (protobuf) y devuelve el nuevo valor.
+    async def fijar(self, etiqueta, valor, requerido=True):
+        widget = self.widget(etiqueta, requerido)
+        if widget is None:
+            return
+        elemento, tipo, fragmento = widget
+        estado = WidgetState(id=elemento.id)
+        nuevo = valor(elemento)
+        if tipo == "multiselect":
+            estado.string_array_value.data.extend(nuevo)
+        elif tipo == "slider":
+            estado.double_array_value.data.append(nuevo)
+        else:
+            estado.string_value = nuevo
+        self.estados[elemento.id] = estado
+        await self._rerun(fragmento)
+
+    def widget(self, etiqueta, requerido=True):
+        if etiqueta in self.elementos:
+            return self.elementos[etiqueta]
+        if requerido:
+            raise LookupError(f"La página no mostró el widget '{etiqueta}'")
+        return None
+
+    # Valor actual de un multiselect: el enviado por la sesión o el de defecto
+    def seleccion(self, elemento):
+        estado = self.estados.get(elemento.id)
+        if estado is not None:
+            return list(estado.string_array_value.data)
+        return [elemento.options[i] for i in elemento.default]
+
+    async def _rerun(self, fragmento=""):
+        if time.perf_counter() >= self.limite:
+            raise _Interrumpida
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        mensaje.rerun_script.page_name = NOMBRES[self.pagina]
+        mensaje.rerun_script.widget_states.widgets.extend(self.estados.values())
+        if fragmento:
+            mensaje.rerun_script.fragment_id = fragmento
+        inicio = time.perf_counter()
+        await self.ws.send(mensaje.SerializeToString())
+        error = None
+        while True:
+            respuesta = ForwardMsg()
+            try:
+                crudo = await asyncio.wait_for(self.ws.recv(), self.timeout)
+            except asyncio.TimeoutError:
+                error = f"El rerun superó {self.timeout:.0f}s"
+                break
+            respuesta.ParseFromString(crudo)
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "delta" and respuesta.delta.HasField("new_element"):
+                nuevo = respuesta.delta.new_element
+                clase = nuevo.WhichOneof("type")
+                if clase == "exception":
+                    error = error or nuevo.exception.message
+                elif clase in ("selectbox", "multiselect", "slider"):
+                    elemento = getattr(nuevo, clase)
+                    self.elementos[elemento.label] = (
+                        elemento,
+                        clase,
+                        respuesta.delta.fragment_id,
+                    )
+            elif tipo in ("script_finished", "page_not_found"):
+                break
+        self.resultados.append((self.pagina, time.perf_counter() - inicio, error))
+        if error:
+            raise _Interrumpida
+
+
+# =============================================================================
+# Recorridos: cada paso modifica un widget y provoca un rerun
+# =============================================================================
+def _alguno(rng, opciones, maximo=2):
+    opciones = list(opciones)
+    return rng.sample(opciones, k=min(len(opciones), rng.randint(1, maximo)))
+
+
+async def _recorrido_crecimiento(sesion, rng):
+    await sesion.abrir("Crecimiento_Enrollment.py")
+    for opcion in ("Crecimiento de los periodos 20", "Participación Facultades"):
+        await sesion.fijar("Menú", lambda e, o=opcion: o)
+    await sesion.fijar(
+        "Selecciona uno o más semestres:",
+        lambda e: _alguno(rng, e.options),
+        requerido=False,
+    )
+    await sesion.fijar("Menú", lambda e: "Participación Carreras")
+    await sesion.fijar(
+        "Selecciona una o más facultades:",
+        lambda e: _alguno(rng, e.options),
+        requerido=False,
+    )
+
+
+async def _recorrido_bcg(sesion, rng):
+    await sesion.abrir("pages/1_Matriz_BCG.py")
+    await sesion.fijar("Selecciona la Facultad", lambda e: rng.choice(e.options))
+    carreras = sesion.widget("Selecciona la Carrera", requerido=False)
+    if carreras is not None and sesion.seleccion(carreras[0]):
+        actuales = sesion.seleccion(carreras[0])
+        quitada = rng.choice(actuales)
+        await sesion.fijar(
+            "Selecciona la Carrera", lambda e: [c for c in actuales if c != quitada]
+        )
+
+
+async def _recorrido_marketshare(sesion, rng):
+    await sesion.abrir("pages/2_Marketshare.py")
+    await sesion.fijar("Región:", lambda e: _alguno(rng, e.options))
+    nivel = sesion.widget("Nivel:", requerido=False)
+    if nivel is not None and nivel[0].options:
+        await sesion.fijar("Nivel:", lambda e: _alguno(rng, e.options, maximo=1))
+
+
+async def _recorrido_matriculados(sesion, rng):
+    await sesion.abrir("pages/3_MatriculadosCarrera.py")
+    await sesion.fijar(
+        "Elige uno o varios niveles:", lambda e: _alguno(rng, e.options, maximo=3)
+    )
+
+
+async def _recorrido_estrategia(sesion, rng):
+    await sesion.abrir("pages/4_EstrategiaCarreras.py")
+    await sesion.fijar("Modelo", lambda e: rng.choice(list(pronostico.MODELOS)))
+    await sesion.fijar("Semestres a proyectar", lambda e: rng.randint(1, 4))
+    await sesion.fijar("Detalle de la carrera", lambda e: rng.choice(e.options))
+
+
+RECORRIDOS = {
+    "Crecimiento_Enrollment.py": _recorrido_crecimiento,
+    "pages/1_Matriz_BCG.py": _recorrido_bcg,
+    "pages/2_Marketshare.py": _recorrido_marketshare,
+    "pages/3_MatriculadosCarrera.py": _recorrido_matriculados,
+    "pages/4_EstrategiaCarreras.py": _recorrido_estrategia,
+}
+
+# Nombre de cada página en la URL: sin carpeta ni prefijo numérico
+NOMBRES = {
+    pagina: (
+        ""
+        if pagina == "Crecimiento_Enrollment.py"
+        else Path(pagina).stem.split("_", 1)[-1]
+    )
+    for pagina in RECORRIDOS
+}
+
+
+# =============================================================================
+# Servidor real y clientes (un servidor nuevo por nivel de concurrencia)
+# =============================================================================
+async def _cliente(puerto, semilla, limite, timeout, resultados):
+    import websockets
+
+    rng = random.Random(semilla)
+    async with websockets.connect(
+        f"ws://127.0.0.1:{puerto}/_stcore/stream",
+        subprotocols=["streamlit"],
+        max_size=None,
+    ) as ws:
+        sesion = _Sesion(ws, limite, timeout, resultados)
+        while time.perf_counter() < limite:
+            pagina = rng.choice(list(RECORRIDOS))
+            try:
+                await RECORRIDOS[pagina](sesion, rng)
+            except _Interrumpida:
+                pass
+            except LookupError as error:
+                # Error sin rerun: no cuenta para las latencias
+                resultados.append((pagina, None, repr(error)))
+
+
+async def _medir_rss(pid, fin, muestras):
+    while not fin.is_set():
+        rss = rss_mb(pid)
+        if rss is not None:
+            muestras.append(rss)
+        await asyncio.sleep(0.2)
+
+
+async def _sesiones(puerto, pid, concurrencia, duracion, timeout, semilla):
+    resultados = []
+    muestras = []
+    fin = asyncio.Event()
+    medidor = asyncio.create_task(_medir_rss(pid, fin, muestras))
+    inicio = time.perf_counter()
+    limite = inicio + duracion
+    await asyncio.gather(
+        *(
+            _cliente(puerto, semilla + i, limite, timeout, resultados)
+            for i in range(concurrencia)
+        )
+    )
+    duracion_real = time.perf_counter() - inicio
+    fin.set()
+    await medidor
+    return resultados, duracion_real, muestras
+
+
+def _servidor(concurrencia, duracion, timeout, semilla):
+    puerto = puerto_libre()
+    comando = [
+        sys.executable,
+        "servidor.py",
+        "--server.headless",
+        "true",
+        "--server.port",
+        str(puerto),
+        "--server.fileWatcherType",
+        "none",
+        "--browser.gatherUsageStats",
+        "false",
+    ]
+    proceso = subprocess.Popen(
+        comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_salud(puerto, time.perf_counter() + 60)
+        rss_inicial = rss_mb(proceso.pid)
+        resultados, duracion_real, muestras = asyncio.run(
+            _sesiones(puerto, proceso.pid, concurrencia, duracion, timeout, semilla)
+        )
+        rss_final = rss_mb(proceso.pid)
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+
+    return {
+        "concurrencia": concurrencia,
+        "duracion": duracion_real,
+        "resultados": resultados,
+        "rss_inicial": rss_inicial,
+        "rss_pico": max(muestras, default=rss_final),
+        "rss_final": rss_final,
+    }
+
+
+# =============================================================================
+# Informe
+# =============================================================================
+def resumir(nivel):
+    reruns = [r for r in nivel["resultados"] if r[1] is not None]
+    latencias = np.array([latencia for _, latencia, _ in reruns])
+    errores = [error for _, _, error in nivel["resultados"] if error]
+    p50, p95, p99 = (
+        np.percentile(latencias * 1000, [50, 95, 99]) if len(latencias) else (0, 0, 0)
+    )
+    por_pagina = {}
+    for pagina, latencia, _ in reruns:
+        por_pagina.setdefault(pagina, []).append(latencia * 1000)
+    return {
+        "concurrencia": nivel["concurrencia"],
+        "reruns": len(latencias),
+        "errores": len(errores),
+        "primer_error": errores[0] if errores else None,
+        "reruns_por_segundo": len(latencias) / nivel["duracion"],
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "rss_inicial_mb": nivel["rss_inicial"],
+        "rss_pico_mb": nivel["rss_pico"],
+        "rss_final_mb": nivel["rss_final"],
+        "p95_por_pagina_ms": {
+            pagina: float(np.percentile(valores, 95))
+            for pagina, valores in sorted(por_pagina.items())
+        },
+    }
+
+
+def imprimir(resumenes, detalle=False):
+    encabezado = (
+        f"{'sesiones':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'errores':>7} {'RSS pico MB':>12}"
+    )
+    print(encabezado)
+    print("-" * len(encabezado))
+    for r in resumenes:
+        # Fuera de Linux no se puede leer el RSS de otro proceso
+        rss = "-" if r["rss_pico_mb"] is None else f"{r['rss_pico_mb']:.0f}"
+        print(
+            f"{r['concurrencia']:>8} {r['reruns']:>7} {r['reruns_por_segundo']:>8.1f} "
+            f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+            f"{r['errores']:>7} {rss:>12}"
+        )
+        if detalle:
+            for pagina, p95 in r["p95_por_pagina_ms"].items():
+                print(f"{'':>8}   p95 {p95:>8.0f} ms  {pagina}")
+            if r["primer_error"]:
+                print(f"{'':>8}   primer error: {r['primer_error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simula sesiones concurrentes del dashboard y mide la latencia de los reruns."
+    )
+    parser.add_argument(
+        "--concurrencia",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Niveles de sesiones concurrentes a probar",
+    )
+    parser.add_argument("--duracion", type=float, default=20, help="Segundos por nivel")
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="Tiempo máximo por rerun (s)"
+    )
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--detalle", action="store_true", help="Mostrar el p95 por página"
+    )
+    parser.add_argument("--json", help="Guardar el resumen en este archivo")
+    args = parser.parse_args(argv)
+
+    resumenes = []
+    for concurrencia in args.concurrencia:
+        print(f"Probando {concurrencia} sesiones durante {args.duracion:.0f}s...")
+        # Servidor nuevo por nivel: cachés frías y memoria medida desde cero
+        nivel = _servidor(concurrencia, args.duracion, args.timeout, args.semilla)
+        resumenes.append(resumir(nivel))
+
+    print()
+    imprimir(resumenes, detalle=args.detalle)
+    if args.json:
+        Path(args.json).write_text(json.dumps(resumenes, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
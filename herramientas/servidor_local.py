@@ -0,0 +1,34 @@
+# Utilidades compartidas por las herramientas que levantan un servidor de
+# Streamlit local y lo miden (arranque_en_frio, prueba_carga).
+import socket
+import time
+import urllib.request
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Memoria residente del proceso en MB, o None si no se puede leer (solo Linux)
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for linea in status:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def esperar_salud(puerto, limite):
+    url = f"http://127.0.0.1:{puerto}/_stcore/health"
+    while time.perf_counter() < limite:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as respuesta:
+                if respuesta.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("El servidor no respondió a tiempo")
@@ -1,15 +1,53 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+
+from analisis import agregaciones, cambios, datos, graficos, memoria
 
 st.set_page_config(layout="wide")
 
 # Cargar los datos
-df = pd.read_excel("./files/baseMarketShare2.xlsx")
+df = datos.leer_marketshare()
 
 # Título de la aplicación
 st.title("MARKETSHARE")
 
+# Resumen del último cambio detectado en la base (ver analisis.cambios)
+ultimo_cambio = datos.cambios_recientes("marketshare")
+if ultimo_cambio is not None:
+    with st.expander("Cambios en la última versión de los datos"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Claves agregadas", ultimo_cambio["claves_agregadas"])
+        col2.metric("Claves eliminadas", ultimo_cambio["claves_eliminadas"])
+        col3.metric("Claves modificadas", ultimo_cambio["claves_modificadas"])
+        st.caption(
+            f"{ultimo_cambio['resultados_conservados']} resultados en caché "
+            f"conservados, {ultimo_cambio['resultados_invalidados']} recalculados"
+        )
+        st.dataframe(ultimo_cambio["tocadas"], hide_index=True)
+
+
+# Agregado y figura compartidos entre sesiones para cada combinación de filtros.
+# Con una versión nueva del archivo solo se recalculan los filtros que alcanzan
+# filas que cambiaron.
+def _afectada(args, tocadas):
+    return cambios.afecta(dict(args[1]), tocadas)
+
+
+@memoria.memorizar("marketshare", max_entradas=128, afectada=_afectada)
+def participacion_y_figura(version, filtros):
+    # Filtrar, agrupar por universidad y año y calcular la participación
+    df_agrupado = agregaciones.participacion_universidades(
+        datos.leer_marketshare(), dict(filtros)
+    )
+    if df_agrupado.empty:
+        return df_agrupado, None
+
+    # Determinar el rango de años para la escala azul (AÑO y UNIVERSIDAD no
+    # tienen vacíos, así que el agregado tiene los mismos años que los filtros)
+    min_year = df_agrupado["AÑO"].min()
+    max_year = df_agrupado["AÑO"].max()
+    return df_agrupado, graficos.figura_marketshare(df_agrupado, min_year, max_year)
+
+
 # Filtros en la barra lateral
 st.sidebar.header("Filtros")
 
@@ -58,7 +96,7 @@ if nivel:
 # Filtro de Facultad
 facultad = st.sidebar.selectbox(
     "Facultad:",
-    options=[None] + filtered_df["FACULTAD"].unique().tolist(),
+    options=[None] + filtered_df["FACULTAD"].dropna().unique().tolist(),
     index=0,
     help="Selecciona una facultad",
 )
@@ -75,15 +113,16 @@ carrera = st.sidebar.multiselect(
 if carrera:
     filtered_df = filtered_df[filtered_df["CARRERA"].isin(carrera)]
 
-# Determinar el rango de años para la escala azul
-min_year = min(filtered_df["AÑO"].unique())
-max_year = max(filtered_df["AÑO"].unique())
-
-# Agrupar por universidad y año
-df_agrupado = (
-    filtered_df.groupby(["AÑO", "UNIVERSIDAD"])
-    .agg({"MATRICULADOS": "sum"})
-    .reset_index()
+filtros = (
+    ("AÑO", tuple(anio)),
+    ("REGION", tuple(region)),
+    ("FINANCIAMIENTO", tuple(financiamiento)),
+    ("NIVEL", tuple(nivel)),
+    ("FACULTAD", (facultad,) if facultad else ()),
+    ("CARRERA", tuple(carrera)),
+)
+df_agrupado, fig = participacion_y_figura(
+    datos.version_archivo(datos.RUTA_MARKETSHARE), filtros
 )
 
 # Verificar que haya datos
@@ -91,65 +130,5 @@ if df_agrupado.empty:
     st.write("No hay datos con los filtros seleccionados.")
     st.stop()
 
-# Calcular la participación
-df_agrupado["PARTICIPACION"] = df_agrupado.groupby("AÑO")["MATRICULADOS"].transform(
-    lambda x: x / x.sum()
-)
-
-# Crear la figura
-fig = go.Figure()
-
-# Calcular el orden global de universidades (de menor a mayor participación acumulada)
-orden_universidades = (
-    df_agrupado.groupby("UNIVERSIDAD")["PARTICIPACION"]
-    .sum()
-    .sort_values()
-    .index.tolist()
-)
-
-# Obtener los años únicos
-años = df_agrupado["AÑO"].unique()
-
-
-# Función para interpolar de celeste a azul fuerte
-def interpolate_blue(intensity):
-    r = int(204 + (0 - 204) * intensity)
-    g = int(229 + (76 - 229) * intensity)
-    b = int(255 + (153 - 255) * intensity)
-    return f"rgb({r}, {g}, {b})"
-
-
-# Dibujar barras para cada año
-for i, año in enumerate(años):
-    df_year = df_agrupado[df_agrupado["AÑO"] == año]
-
-    # Calcular la intensidad basada en el año (año mayor = azul más fuerte)
-    intensity = (año - min_year) / (max_year - min_year) if max_year != min_year else 1
-    blue_color = interpolate_blue(intensity)
-    colors = [blue_color] * len(df_year)
-
-    fig.add_trace(
-        go.Bar(
-            x=df_year["PARTICIPACION"],
-            y=df_year["UNIVERSIDAD"],
-            marker_color=colors,
-            orientation="h",
-            name=f"Año {año}",
-        )
-    )
-
-
-# Configurar el layout aplicando el orden global en el eje Y
-fig.update_layout(
-    barmode="group",
-    title="Participación por Universidad y Año",
-    xaxis_title="Participación",
-    yaxis_title="Universidades",
-    template="plotly_white",
-    height=700,
-    yaxis=dict(categoryorder="array", categoryarray=orden_universidades),
-    legend=dict(traceorder="reversed"),
-)
-
 # Mostrar el gráfico en Streamlit
 st.plotly_chart(fig)
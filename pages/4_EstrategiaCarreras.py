@@ -1,4 +1,180 @@
+import time
+
 import streamlit as st
+import plotly.graph_objects as go
+
+from analisis import datos, memoria, pronostico
+
+st.set_page_config(layout="wide")
 
 st.title("Análisis Estratégico de Carreras")
 
+
+# Pronóstico de todas las carreras de PREGRADO. La versión del archivo forma
+# parte de la clave, así que reemplazar el Excel invalida el resultado. Los
+# resultados son compartidos entre sesiones y se ven en la página de memoria.
+@memoria.memorizar("pronosticos")
+def pronosticar(version, modelo, horizonte):
+    df = datos.leer_pregrado()
+    inicio = time.perf_counter()
+    resumen, series, futuros = pronostico.pronosticar_carreras(df, modelo, horizonte)
+    return resumen, series, futuros, time.perf_counter() - inicio
+
+
+# Sidebar para la configuración del pronóstico
+st.sidebar.header("Pronóstico")
+modelo = st.sidebar.selectbox(
+    "Modelo",
+    options=list(pronostico.MODELOS),
+    format_func=pronostico.MODELOS.get,
+    help="Modelo de tendencia ajustado a cada carrera",
+)
+horizonte = st.sidebar.slider(
+    "Semestres a proyectar", min_value=1, max_value=4, value=1
+)
+
+try:
+    resumen, series, futuros, duracion = pronosticar(
+        datos.version_archivo(datos.RUTA_ENROLLMENT), modelo, horizonte
+    )
+except FileNotFoundError:
+    st.error(f"El archivo '{datos.RUTA_ENROLLMENT}' no se encuentra.")
+    st.stop()
+
+st.caption(
+    f"{len(resumen)} carreras proyectadas a {futuros[-1]} en {duracion * 1000:.0f} ms"
+)
+
+# Filtro por Facultad
+facultades = sorted(resumen["FACULTAD"].unique())
+facultades_seleccionadas = st.sidebar.multiselect(
+    "Facultad", options=facultades, default=facultades
+)
+resumen_filtrado = resumen[resumen["FACULTAD"].isin(facultades_seleccionadas)]
+
+if resumen_filtrado.empty:
+    st.warning("No hay datos disponibles para los filtros seleccionados.")
+    st.stop()
+
+# --- Conteo de carreras por cuadrante ---
+conteo = resumen_filtrado["CUADRANTE PROYECTADO"].value_counts()
+columnas = st.columns(len(pronostico.CUADRANTES))
+for columna, cuadrante in zip(columnas, pronostico.CUADRANTES.values()):
+    actual = (resumen_filtrado["CUADRANTE ACTUAL"] == cuadrante).sum()
+    proyectado = int(conteo.get(cuadrante, 0))
+    columna.metric(cuadrante, proyectado, delta=int(proyectado - actual))
+
+# --- Matriz BCG proyectada ---
+colores_cuadrante = {
+    "Estrella": "#800020",
+    "Vaca lechera": "#404040",
+    "Interrogante": "#8c8c8c",
+    "Perro": "#c8c8c8",
+}
+puntos = resumen_filtrado.dropna(subset=["Variación Enrollment", "Variación Ingresos"])
+
+fig = go.Figure()
+for cuadrante, color in colores_cuadrante.items():
+    df_cuadrante = puntos[puntos["CUADRANTE PROYECTADO"] == cuadrante]
+    fig.add_trace(
+        go.Scatter(
+            x=df_cuadrante["Variación Enrollment"],
+            y=df_cuadrante["Variación Ingresos"],
+            mode="markers+text",
+            marker=dict(
+                size=df_cuadrante["ENROLLMENT PROYECTADO"],
+                sizemode="area",
+                sizeref=2.0 * max(puntos["ENROLLMENT PROYECTADO"].max(), 1) / (40.0**2),
+                sizemin=4,
+                color=color,
+                line=dict(width=1, color="DarkSlateGrey"),
+            ),
+            text=df_cuadrante["CARRERA"],
+            textposition="top center",
+            hovertemplate=(
+                "<b>Carrera:</b> %{text}<br>"
+                "<b>Variación de Enrollment:</b> %{x:.2f}%<br>"
+                "<b>Variación de Ingresos:</b> %{y:.2f}%<br>"
+                "<extra></extra>"
+            ),
+            name=cuadrante,
+        )
+    )
+fig.add_vline(x=0, line=dict(color="Black", dash="dash"))
+fig.add_hline(y=0, line=dict(color="Black", dash="dash"))
+fig.update_layout(
+    title=f"Matriz BCG proyectada ({futuros[-1]})",
+    xaxis_title="Variación de Enrollment (%)",
+    yaxis_title="Variación de Ingresos (%)",
+    legend_title="Cuadrante",
+    template="plotly_white",
+    height=700,
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Tabla de proyecciones ---
+st.dataframe(
+    resumen_filtrado.style.format(
+        {
+            "ENROLLMENT PROYECTADO": "{:.0f}",
+            "INGRESOS PROYECTADOS": "{:,.0f}",
+            "Variación Enrollment": "{:.1f}%",
+            "Variación Ingresos": "{:.1f}%",
+        }
+    ),
+    use_container_width=True,
+    hide_index=True,
+)
+
+
+# --- Detalle por carrera: historia y proyección ---
+# Fragmento: elegir otra carrera solo redibuja este gráfico, sin volver a
+# construir la matriz ni la tabla de arriba.
+@st.fragment
+def detalle_carrera(resumen_filtrado, series, futuros):
+    carrera = st.selectbox("Detalle de la carrera", resumen_filtrado["CARRERA"])
+    facultad = resumen_filtrado.loc[
+        resumen_filtrado["CARRERA"] == carrera, "FACULTAD"
+    ].iloc[0]
+
+    fig_detalle = go.Figure()
+    for variable, eje, color in (
+        ("ENROLLMENT", "y", "#800020"),
+        ("INGRESOS", "y2", "#666666"),
+    ):
+        serie = series[variable].loc[(facultad, carrera)]
+        historia = serie.drop(futuros)
+        # La proyección arranca en el último semestre observado para unir las líneas
+        proyeccion = serie.iloc[len(historia) - 1 :]
+        fig_detalle.add_trace(
+            go.Scatter(
+                x=historia.index,
+                y=historia,
+                name=variable.capitalize(),
+                mode="lines+markers",
+                line=dict(color=color, width=2),
+                yaxis=eje,
+            )
+        )
+        fig_detalle.add_trace(
+            go.Scatter(
+                x=proyeccion.index,
+                y=proyeccion,
+                name=f"{variable.capitalize()} proyectado",
+                mode="lines+markers",
+                line=dict(color=color, width=2, dash="dot"),
+                yaxis=eje,
+            )
+        )
+    fig_detalle.update_layout(
+        xaxis_title="Semestre",
+        yaxis=dict(title="Enrollment"),
+        yaxis2=dict(title="Ingresos", overlaying="y", side="right"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+    )
+    fig_detalle.update_xaxes(type="category")
+    st.plotly_chart(fig_detalle, use_container_width=True)
+
+
+detalle_carrera(resumen_filtrado, series, futuros)
@@ -0,0 +1,104 @@
+import pandas as pd
+import streamlit as st
+
+import administracion
+
+st.set_page_config(layout="wide")
+
+st.title("Memoria del servidor")
+
+MB = 1024**2
+
+# Mensaje de la última acción: se guarda antes de st.rerun() y se muestra en la
+# ejecución siguiente, que es la que ve el usuario
+if "memoria_mensaje" in st.session_state:
+    st.success(st.session_state.pop("memoria_mensaje"))
+
+informe = administracion.informe()
+proceso = informe["proceso"]
+
+# --- Resumen del proceso ---
+col1, col2, col3, col4 = st.columns(4)
+if proceso["rss_bytes"] is not None:
+    col1.metric("RSS del proceso", f"{proceso['rss_bytes'] / MB:.0f} MB")
+col2.metric("En cachés", f"{proceso['bytes_en_caches'] / MB:.1f} MB")
+col3.metric("Estado de sesiones", f"{proceso['bytes_en_sesiones'] / MB:.2f} MB")
+col4.metric("Sesiones", len(informe["sesiones"]))
+
+# --- Entradas en caché ---
+st.subheader("Entradas en caché")
+entradas = pd.DataFrame(
+    informe["entradas"],
+    columns=[
+        "cache",
+        "clave",
+        "version",
+        "bytes",
+        "aciertos",
+        "edad_s",
+        "inactiva_s",
+    ],
+)
+st.dataframe(
+    entradas.assign(MB=entradas["bytes"] / MB).drop(columns="bytes"),
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        "MB": st.column_config.NumberColumn(format="%.2f"),
+        "edad_s": st.column_config.NumberColumn("Edad (s)", format="%.0f"),
+        "inactiva_s": st.column_config.NumberColumn("Sin uso (s)", format="%.0f"),
+    },
+)
+
+# --- Desalojo y límites ---
+# Cambian las cachés que comparten todas las sesiones, así que piden el mismo
+# token que el endpoint de administracion
+limites = informe["limites"]
+st.subheader("Desalojo y límites")
+if administracion.token() is None:
+    st.info(
+        "Sin ADMIN_TOKEN ni endpoint de memoria (servidor.py --admin-puerto) "
+        "la página es solo de lectura."
+    )
+elif not administracion.token_valido(
+    st.text_input("Token de administración", type="password")
+):
+    st.caption("Ingresa el token de administración para desalojar o fijar límites.")
+else:
+    cache = st.selectbox("Caché", options=list(limites))
+
+    col_desalojo, col_limite = st.columns(2)
+    with col_desalojo:
+        claves = entradas.loc[entradas["cache"] == cache, "clave"].tolist()
+        clave = st.selectbox(
+            "Entrada", options=[None] + claves, format_func=lambda c: c or "Todas"
+        )
+        if st.button("Desalojar"):
+            quitadas = administracion.desalojar(cache, clave)
+            st.session_state["memoria_mensaje"] = f"{quitadas} entradas desalojadas"
+            st.rerun()
+
+    with col_limite:
+        actual = limites[cache]["max_bytes"]
+        limite_mb = st.number_input(
+            "Límite en MB (0 = sin límite)",
+            min_value=0.0,
+            value=(actual or 0) / MB,
+            step=10.0,
+        )
+        if st.button("Aplicar límite"):
+            administracion.fijar_limite(cache, max_bytes=int(limite_mb * MB) or None)
+            st.session_state["memoria_mensaje"] = f"Límite de '{cache}' actualizado"
+            st.rerun()
+
+# --- Sesiones ---
+st.subheader("Sesiones")
+if informe["sesiones"]:
+    st.dataframe(pd.DataFrame(informe["sesiones"]), hide_index=True)
+else:
+    st.info("No hay sesiones registradas en este proceso.")
+
+# --- Cachés propias de Streamlit ---
+if informe["streamlit"]:
+    st.subheader("Cachés de Streamlit")
+    st.dataframe(pd.DataFrame(informe["streamlit"]), hide_index=True)
@@ -0,0 +1,78 @@
+# Arranque del dashboard con precalentamiento.
+#
+# Uso (acepta las mismas opciones que `streamlit run`):
+#     python servidor.py --server.port 8501
+#     python servidor.py --admin-puerto 8601 --server.port 8501
+#     python servidor.py --motor polars --server.port 8501
+#
+# En cuanto el servidor está arriba, un hilo lee todos los libros de Excel, así
+# el primer visitante después de un despliegue o reinicio no paga ese tiempo.
+# Las páginas usan la misma caché de analisis.datos, porque corren dentro de
+# este mismo proceso.
+#
+# Con --admin-puerto se sirve además, solo en localhost, el endpoint JSON de
+# memoria (ver administracion.py) para inspeccionar y desalojar las cachés. Sus
+# solicitudes requieren un token: el de ADMIN_TOKEN o uno generado al arrancar,
+# que se muestra en la consola.
+#
+# --motor elige el motor de las agregaciones (pandas o polars, ver
+# analisis.agregaciones); equivale a fijar MOTOR_AGREGACIONES.
+import argparse
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+SCRIPT_PRINCIPAL = RAIZ / "Crecimiento_Enrollment.py"
+
+
+# La lectura de los libros compite por el GIL con el arranque de Streamlit, así
+# que se espera a que el servidor acepte conexiones para no retrasarlo.
+def _esperar_servidor(limite=30):
+    from streamlit import config
+
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            puerto = config.get_option("server.port")
+            with socket.create_connection(("127.0.0.1", puerto), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+
+def main():
+    # Streamlit se importa antes de lanzar el hilo: sus importaciones (plotly
+    # incluido) no son seguras si se hacen a la vez desde dos hilos.
+    from streamlit.web import cli
+
+    from analisis import agregaciones, datos
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--admin-puerto", type=int)
+    parser.add_argument("--motor", choices=agregaciones.MOTORES)
+    args, opciones_streamlit = parser.parse_known_args()
+
+    if args.motor:
+        agregaciones.fijar_motor(args.motor)
+
+    datos.precalentar(esperar=_esperar_servidor)
+    if args.admin_puerto:
+        import administracion
+
+        endpoint = administracion.iniciar_endpoint(args.admin_puerto)
+        if "ADMIN_TOKEN" not in os.environ:
+            print(
+                f"Endpoint de memoria en http://127.0.0.1:{args.admin_puerto}/memoria"
+                f" (token: {endpoint.token})",
+                flush=True,
+            )
+
+    sys.argv = ["streamlit", "run", str(SCRIPT_PRINCIPAL), *opciones_streamlit]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Límites de las cachés de analisis.memoria y del endpoint de administracion
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import administracion
+from analisis import memoria
+
+
+@pytest.fixture
+def cache():
+    nombre = "prueba_limites"
+    memoria.registrar(nombre)
+    memoria.fijar_limite(nombre, max_entradas=128, max_bytes=None)
+    yield nombre
+    memoria.desalojar(nombre)
+
+
+def test_limite_omitido_se_conserva(cache):
+    memoria.fijar_limite(cache, max_bytes=50_000)
+    assert memoria.limites()[cache] == {"max_entradas": 128, "max_bytes": 50_000}
+
+    memoria.fijar_limite(cache, max_entradas=8)
+    assert memoria.limites()[cache] == {"max_entradas": 8, "max_bytes": 50_000}
+
+    memoria.fijar_limite(cache, max_bytes=None)
+    assert memoria.limites()[cache] == {"max_entradas": 8, "max_bytes": None}
+
+
+def test_endpoint_conserva_el_otro_limite(cache):
+    endpoint = administracion.iniciar_endpoint(0, token="secreto")
+    url = f"http://127.0.0.1:{endpoint.server_port}/memoria/limite?cache={cache}"
+
+    def post(consulta, token="secreto"):
+        solicitud = urllib.request.Request(
+            url + consulta, method="POST", headers={"Authorization": f"Bearer {token}"}
+        )
+        with urllib.request.urlopen(solicitud) as respuesta:
+            return json.load(respuesta)["limites"][cache]
+
+    try:
+        assert post("&max_bytes=50000") == {"max_entradas": 128, "max_bytes": 50_000}
+        assert post("&max_entradas=8") == {"max_entradas": 8, "max_bytes": 50_000}
+        assert post("&max_bytes=0") == {"max_entradas": 8, "max_bytes": None}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post("&max_bytes=1", token="otro")
+        assert error.value.code == 401
+    finally:
+        endpoint.shutdown()
+        administracion._token = None
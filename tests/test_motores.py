@@ -0,0 +1,38 @@
+# Paridad de los motores de agregaciones: los mismos casos que
+# herramientas.comparar_motores, sobre las bases reales y sobre una copia
+# escalada. Se omite si polars no está instalado.
+import pytest
+
+pytest.importorskip("polars")
+
+from analisis import agregaciones, datos, memoria, motor_polars
+from herramientas.comparar_motores import _casos, _motor, comprobar_paridad, escalar
+
+
+@pytest.fixture(scope="module")
+def bases():
+    return datos.leer_marketshare(), datos.leer_pregrado()
+
+
+def test_paridad_bases_reales(bases):
+    assert comprobar_paridad(_casos(*bases)) == 0
+
+
+def test_paridad_bases_escaladas(bases):
+    marketshare, pregrado = bases
+    casos = _casos(
+        escalar(marketshare, 3, "UNIVERSIDAD", "MATRICULADOS"),
+        escalar(pregrado, 3, "CARRERA", "ENROLLMENT"),
+    )
+    assert comprobar_paridad(casos) == 0
+
+
+# Las conversiones a Polars se cuentan y se desalojan como cualquier caché
+def test_conversiones_en_memoria(bases):
+    marketshare, _ = bases
+    memoria.desalojar(motor_polars.CACHE)
+    with _motor("polars"):
+        agregaciones.participacion_universidades(marketshare)
+    entradas = [e for e in memoria.inventario() if e["cache"] == motor_polars.CACHE]
+    assert len(entradas) == 1 and entradas[0]["bytes"] > 0
+    assert memoria.desalojar(motor_polars.CACHE) == 1